@@ -2,7 +2,7 @@ pip install py2app
 rm -rf setup.py
 rm -rf build
 rm -rf dist
-py2applet --make-setup src/bundled.py "Disease Sim Icon.icns"
+py2applet --make-setup src/main.py "Disease Sim Icon.icns"
 match='setup('
 insert='    name="Disease Simulator",'
 sed -i "" "s/$match/$match\n$insert/" setup.py
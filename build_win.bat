@@ -1,4 +1,4 @@
 pip3 install pyinstaller
 rmdir /S /Q build
 rmdir /S /Q dist
-pyinstaller --noconfirm --onefile --windowed --icon "Disease Sim Icon.ico" --name "Disease Simulator"  "src\bundled.py"
\ No newline at end of file
+pyinstaller --noconfirm --onefile --windowed --icon "Disease Sim Icon.ico" --name "Disease Simulator"  "src\main.py"
\ No newline at end of file
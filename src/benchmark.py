@@ -0,0 +1,154 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from engines import engines, makeSimulation
+try:
+    import resource
+except ImportError:   # windows
+    resource = None
+
+'''
+Times the simulation engines over a matrix of population sizes, virulences and engines
+
+Every case is run in a fresh process so its peak memory is its own, with a fixed seed so
+each run does the same work. A case is run at least repeat times, and until it has taken
+minSeconds, and the fastest run is kept. Building the simulation is timed separately from
+running it, the headline number is days per second of dayTick (which covers
+Person.dayTick, spreading and getStats).
+
+Each benchmark run is appended to a json history file. Saving a run as the baseline lets
+later runs flag cases that got slower, or use more memory, by more than the tolerance.
+'''
+
+avgDTI, avgIL, DC = 3, 20, 0.1
+
+def peakRSS():   # most memory this process has used, in MB
+    if(resource is None): return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10   # bytes on mac, KB on linux
+
+def timeCase(engine, population, virulence, days, seed, repeat, minSeconds):
+    makeSimulation(engine, 10, virulence, avgDTI, avgIL, DC, seed=seed).run(1)   # imports the engine outside the timing
+    best = None
+    runs, total = 0, 0
+    while(runs < repeat or total < minSeconds):   # quick cases are run until they have taken minSeconds, so they are not just noise
+        start = time.perf_counter()
+        sim = makeSimulation(engine, population, virulence, avgDTI, avgIL, DC, seed=seed)
+        built = time.perf_counter()
+        sim.run(days)
+        end = time.perf_counter()
+        runs += 1
+        total += end - start
+        if(best is None or end - built < best[1]): best = (built - start, end - built, sim.day)
+    setupSeconds, seconds, numDays = best
+    return {
+        "engine": engine, "population": population, "virulence": virulence, "seed": seed,
+        "days": numDays, "runs": runs, "setupSeconds": setupSeconds, "seconds": seconds,
+        "daysPerSecond": numDays / seconds if seconds > 0 else None, "peakRSS": peakRSS(),
+    }
+
+def runCase(*args):
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(timeCase, *args).result()
+
+def caseKey(result):
+    return (result["engine"], result["population"], result["virulence"])
+
+class Benchmark:
+    def __init__(self, populations=(1000, 10000, 100000, 1000000), virulences=(0.3, 0.8), engines=engines, days=20, seed=0, repeat=3, minSeconds=1):
+        self.populations = list(populations)
+        self.virulences = list(virulences)
+        self.engines = list(engines)
+        self.days = days
+        self.seed = seed
+        self.repeat = repeat
+        self.minSeconds = minSeconds
+
+    def cases(self):
+        return [(e, p, v) for e in self.engines for p in self.populations for v in self.virulences]
+
+    def run(self, progress=None):
+        results = []
+        for engine, population, virulence in self.cases():
+            result = runCase(engine, population, virulence, self.days, self.seed, self.repeat, self.minSeconds)
+            results.append(result)
+            if(progress is not None): progress(result)
+        return {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "days": self.days, "repeat": self.repeat,
+            "results": results,
+        }
+
+def compare(run, baseline, tolerance=0.2):   # a message for every case that regressed against the baseline
+    base = {caseKey(r): r for r in baseline["results"]}
+    regressions = []
+    for result in run["results"]:
+        old = base.get(caseKey(result))
+        if(old is None): continue
+        name = f"{result['engine']} population={result['population']} virulence={result['virulence']}"
+        if(result["daysPerSecond"] and old["daysPerSecond"] and result["daysPerSecond"] < old["daysPerSecond"] * (1 - tolerance)):
+            regressions.append(f"{name}: {result['daysPerSecond']:.1f} days/s, baseline {old['daysPerSecond']:.1f}")
+        if(result["peakRSS"] and old["peakRSS"] and result["peakRSS"] > old["peakRSS"] * (1 + tolerance)):
+            regressions.append(f"{name}: peak RSS {result['peakRSS']:.0f} MB, baseline {old['peakRSS']:.0f} MB")
+    return regressions
+
+def appendHistory(filename, run):
+    try:
+        with open(filename) as file: history = json.load(file)
+    except FileNotFoundError:
+        history = []
+    history.append(run)
+    with open(filename, "w") as file:
+        json.dump(history, file, indent=1)
+
+def formatResult(result):
+    rss = f"{result['peakRSS']:8.0f} MB" if result["peakRSS"] is not None else "       ? MB"
+    speed = f"{result['daysPerSecond']:10.1f}" if result["daysPerSecond"] is not None else "         ?"
+    return f"{result['engine']:>7} {result['population']:>8} {result['virulence']:>5} {speed} days/s {result['setupSeconds']:8.3f}s setup {rss}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the simulation engines and check for regressions against a saved baseline")
+    parser.add_argument("--populations", default="1000,10000,100000,1000000")
+    parser.add_argument("--virulence", default="0.3,0.8")
+    parser.add_argument("--engines", default=",".join(engines))
+    parser.add_argument("--days", type=int, default=20, help="days to run each case for")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each case, the fastest is kept")
+    parser.add_argument("--min-seconds", type=float, default=1, help="keep running quick cases until they have taken this long")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", default="benchmark_history.json")
+    parser.add_argument("--baseline", default="benchmark_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="save this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="fraction slower or bigger than the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    chosen = args.engines.split(",")
+    unknown = [e for e in chosen if e not in engines]
+    if(unknown): parser.error(f"unknown engines {unknown}, expected some of {engines}")
+    benchmark = Benchmark([int(p) for p in args.populations.split(",")], [float(v) for v in args.virulence.split(",")], chosen, args.days, args.seed, args.repeat, args.min_seconds)
+    run = benchmark.run(progress=lambda result: print(formatResult(result), flush=True))
+    appendHistory(args.history, run)
+
+    if(args.save_baseline):
+        with open(args.baseline, "w") as file: json.dump(run, file, indent=1)
+        print(f"Saved baseline to {args.baseline}")
+        return
+    try:
+        with open(args.baseline) as file: baseline = json.load(file)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}, run with --save-baseline to make one")
+        return
+    regressions = compare(run, baseline, args.tolerance)
+    for message in regressions: print(f"REGRESSION {message}")
+    if(regressions): sys.exit(1)
+    print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+if __name__ == "__main__":
+    main()
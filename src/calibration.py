@@ -0,0 +1,237 @@
+import argparse
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from engines import engines, makeSimulation
+
+parameters = ["virulence", "avgDTI", "avgIL", "DC"]
+integerParameters = ["avgDTI", "avgIL"]
+
+'''
+Fits parameters to an observed epidemic with ABC-SMC (approximate Bayesian computation,
+sequential Monte Carlo)
+
+observed maps columns of SimulationData (number_infected, number_dead, ...) to their
+counts on days 0, 1, 2, ... and priors maps some of parameters to a (low, high) uniform
+range, the rest are fixed. The distance between a run and the observed data is the root
+mean square difference over the observed days and columns, as a fraction of the
+population. A run that ends before the observed data does keeps its last counts.
+
+The first generation runs particles drawn from the priors. Every later one lowers the
+tolerance to the quantile of the last generation's distances, and draws particles from the
+last generation's, weighted, with a gaussian step of twice their weighted variance, until
+it has as many within the tolerance. Integer parameters are rounded after the step.
+
+A run is only simulated as far as the observed data goes, and since the squared
+differences only add up, it is stopped as soon as they are over what the tolerance allows,
+which is most runs once the tolerance is small. Runs go through a process pool, but are
+accepted in the order they were drawn, so a calibration can be reproduced from its seed
+with any number of workers.
+'''
+
+def runParticle(engine, population_size, cell, seed, observed, tolerance):   # returns the run's distance, inf if it was stopped, and how many days were simulated
+    sim = makeSimulation(engine, population_size, cell["virulence"], cell["avgDTI"], cell["avgIL"], cell["DC"], seed=seed)
+    numDays = len(next(iter(observed.values())))
+    limit = (tolerance * population_size) ** 2 * numDays * len(observed)
+    error = 0.0
+    last = None
+    for day in sim.iterDays(numDays, keepData=False):
+        error += sum((day[name] - values[day["day"]]) ** 2 for name, values in observed.items())
+        if(error > limit): return math.inf, day["day"] + 1
+        last = day
+    daysRun = 0 if last is None else last["day"] + 1
+    if(daysRun < numDays):   # the epidemic is over, its counts stay as they were
+        error += sum(float(((values[daysRun:] - (0 if last is None else last[name])) ** 2).sum()) for name, values in observed.items())
+        if(error > limit): return math.inf, daysRun
+    return math.sqrt(error / (numDays * len(observed))) / population_size, daysRun
+
+class Calibration:
+    def __init__(self, observed, priors, population_size, virulence=0.8, avgDTI=3, avgIL=20, DC=0.1, engine="vector", seed=None, workers=None):
+        unknown = [p for p in priors if p not in parameters]
+        if(unknown): raise ValueError(f"Can not fit {unknown}, expected some of {parameters}")
+        if(not priors): raise ValueError("No priors given, nothing to fit")
+        if(engine not in engines): raise ValueError(f"Unknown engine {engine!r}, expected one of {engines}")
+        self.observed = {name: np.asarray(values, dtype=np.float64) for name, values in observed.items()}
+        if(len({len(values) for values in self.observed.values()}) != 1): raise ValueError("Every observed column should cover the same days")
+        self.priors = {p: (float(min(priors[p])), float(max(priors[p]))) for p in parameters if p in priors}
+        for p, (low, high) in self.priors.items():
+            if(p in integerParameters and math.ceil(low) > math.floor(high)): raise ValueError(f"{p} is a whole number of days, its prior {low}:{high} has none")
+        self.fixed = {"virulence": virulence, "avgDTI": avgDTI, "avgIL": avgIL, "DC": DC}
+        self.popSize = population_size
+        self.engine = engine
+        self.seedSequence = np.random.SeedSequence(seed)
+        self.rng = None
+        self.workers = workers or os.cpu_count()
+
+    def castCell(self, point):
+        cell = dict(self.fixed)
+        for p, value in zip(self.priors, point):
+            cell[p] = int(round(value)) if p in integerParameters else float(value)
+        return cell
+
+    def inPrior(self, point):
+        return all(low <= value <= high for value, (low, high) in zip(point, self.priors.values()))
+
+    def propose(self, last, scale):   # a point from the priors, or a perturbed particle of the last generation
+        if(last is None):
+            return np.array([self.rng.uniform(low, high) for low, high in self.priors.values()])
+        while(True):
+            point = last.points[self.rng.choice(len(last.points), p=last.weights)] + self.rng.normal(0, scale)
+            point = np.array([round(v) if p in integerParameters else v for p, v in zip(self.priors, point)])
+            if(self.inPrior(point)): return point
+
+    def weigh(self, points, last, scale):   # importance weights for a uniform prior, against the gaussian steps from the last generation
+        if(last is None): return np.full(len(points), 1 / len(points))
+        steps = (points[:, None, :] - last.points[None, :, :]) / scale
+        kernel = np.exp(-0.5 * (steps ** 2).sum(axis=-1))
+        weights = 1 / (kernel @ last.weights)
+        return weights / weights.sum()
+
+    def evaluate(self, pool, cell, tolerance):
+        args = (self.engine, self.popSize, cell, int(self.rng.integers(1 << 63)), self.observed, tolerance)
+        if(pool is None): return runParticle(*args)
+        return pool.submit(runParticle, *args)
+
+    def runGeneration(self, pool, particles, tolerance, last):
+        scale = None if last is None else np.sqrt(2 * np.maximum(np.cov(last.points.T, aweights=last.weights, ddof=0).reshape(len(self.priors), -1).diagonal(), 1e-12))
+        self.rng = np.random.default_rng(self.seedSequence.spawn(1)[0])   # runs drawn ahead but not needed do not change later generations
+        generation = Generation(tolerance)
+        points, distances = [], []
+
+        def record(point, result):
+            distance, days = result
+            generation.simulations += 1
+            generation.daysSimulated += days
+            if(distance == math.inf): generation.stoppedEarly += 1
+            if(distance <= tolerance and len(points) < particles):
+                points.append(point)
+                distances.append(distance)
+
+        if(pool is None):
+            while(len(points) < particles):
+                point = self.propose(last, scale)
+                record(point, self.evaluate(None, self.castCell(point), tolerance))
+        else:
+            running = deque()
+            while(len(points) < particles):
+                while(len(running) < self.workers * 2):   # only keep a few runs in flight
+                    point = self.propose(last, scale)
+                    running.append((point, self.evaluate(pool, self.castCell(point), tolerance)))
+                point, future = running.popleft()
+                record(point, future.result())
+            for point, future in running: future.cancel()
+
+        generation.points = np.array(points)
+        generation.distances = np.array(distances)
+        generation.weights = self.weigh(generation.points, last, scale)
+        return generation
+
+    def run(self, particles=200, generations=5, quantile=0.5, minTolerance=0.0, callback=None):
+        posterior = Posterior(list(self.priors), self.seedSequence.entropy)
+        pool = None if self.workers == 1 else ProcessPoolExecutor(self.workers)
+        try:
+            last = None
+            tolerance = math.inf
+            for g in range(generations):
+                last = self.runGeneration(pool, particles, tolerance, last)
+                posterior.generations.append(last)
+                if(callback is not None): callback(g, last)
+                tolerance = float(np.quantile(last.distances, quantile))
+                if(tolerance <= minTolerance): break
+        finally:
+            if(pool is not None): pool.shutdown(cancel_futures=True)
+        return posterior
+
+class Generation:
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.points = None
+        self.weights = None
+        self.distances = None
+        self.simulations = 0
+        self.stoppedEarly = 0
+        self.daysSimulated = 0
+
+    @property
+    def acceptance(self):
+        return len(self.points) / max(self.simulations, 1)
+
+'''
+The weighted particles of the last generation of a Calibration, and the generations
+before it
+'''
+
+class Posterior:
+    def __init__(self, names, entropy=None):
+        self.names = names
+        self.entropy = entropy
+        self.generations = []
+
+    @property
+    def last(self):
+        return self.generations[-1]
+
+    def getColumn(self, name):
+        return self.last.points[:, self.names.index(name)]
+
+    def getMeans(self):
+        return {name: float(np.average(self.getColumn(name), weights=self.last.weights)) for name in self.names}
+
+    def getQuantiles(self, q):
+        order = {name: np.argsort(self.getColumn(name)) for name in self.names}
+        last = len(self.last.points) - 1   # the weights' sum can end just under 1
+        return {name: float(self.getColumn(name)[i][min(np.searchsorted(np.cumsum(self.last.weights[i]), q), last)]) for name, i in order.items()}
+
+    def exportDataAsCSV(self, filename):
+        df = pd.DataFrame({**{name: self.getColumn(name) for name in self.names}, "weight": self.last.weights, "distance": self.last.distances})
+        df.to_csv(filename, index=False)
+
+def loadObserved(filename, columns):   # columns of a csv with a day column, like the cli and exportDataAsCSV write
+    df = pd.read_csv(filename).sort_values("day")
+    if(list(df["day"]) != list(range(len(df)))): raise ValueError(f"{filename} should have one row for every day from 0")
+    missing = [c for c in columns if c not in df]
+    if(missing): raise ValueError(f"{filename} has no {missing} columns")
+    return {c: df[c].to_numpy() for c in columns}
+
+def parseValue(s):   # a fixed number, or low:high to fit it
+    if(":" in s):
+        low, high = s.split(":")
+        return (float(low), float(high))
+    return float(s)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit simulation parameters to an observed epidemic with ABC-SMC. A parameter is a number to fix it or low:high to fit it with a uniform prior")
+    parser.add_argument("observed", help="csv with a day column and the observed columns")
+    parser.add_argument("--columns", default="number_infected", help="comma separated columns to fit to")
+    parser.add_argument("--population", type=int, default=1000)
+    parser.add_argument("--virulence", default="0:1")
+    parser.add_argument("--dti", default="3", help="avg days till infectious")
+    parser.add_argument("--il", default="5:40", help="avg infection length")
+    parser.add_argument("--dc", default="0:0.5", help="mortality")
+    parser.add_argument("--particles", type=int, default=200)
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--quantile", type=float, default=0.5, help="each generation's tolerance is this quantile of the last one's distances")
+    parser.add_argument("--engine", choices=engines, default="vector")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="posterior.csv")
+    args = parser.parse_args()
+
+    values = {"virulence": parseValue(args.virulence), "avgDTI": parseValue(args.dti), "avgIL": parseValue(args.il), "DC": parseValue(args.dc)}
+    priors = {p: v for p, v in values.items() if isinstance(v, tuple)}
+    fixed = {p: (int(v) if p in integerParameters else v) for p, v in values.items() if not isinstance(v, tuple)}
+    observed = loadObserved(args.observed, args.columns.split(","))
+    calibration = Calibration(observed, priors, args.population, engine=args.engine, seed=args.seed, workers=args.workers, **fixed)
+
+    def report(g, generation):
+        print(f"generation {g}: tolerance {generation.tolerance:.4g}, {generation.simulations} runs, {generation.stoppedEarly} stopped early, acceptance {generation.acceptance:.1%}")
+
+    posterior = calibration.run(args.particles, args.generations, args.quantile, callback=report)
+    posterior.exportDataAsCSV(args.out)
+    print(f"Posterior means {posterior.getMeans()} (entropy {posterior.entropy}), saved to {args.out}")
+
+if __name__ == "__main__":
+    main()
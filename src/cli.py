@@ -0,0 +1,78 @@
+import argparse
+import json
+import sys
+from engines import engines, makeSimulation
+
+'''
+Runs one simulation without the GUI
+
+Parameters come from flags, or from a json or toml config file whose keys are the flag
+names (population, virulence, dti, il, dc, engine, seed, max_days, out, append, cache),
+with flags given on the command line winning. The days go to a csv file, "-" for stdout,
+as they are simulated, or to a .dsim file at the end. An existing csv is replaced, so a
+retried job writes the same file, unless --append is given. With --cache DIR a seeded run is looked up in,
+or saved to, a ResultCache there, and the csv is written once it is done.
+
+Only the modules the chosen engine needs are imported, so a small run with the agent
+engine starts without loading numpy, pandas or matplotlib.
+'''
+
+def loadConfig(filename):
+    if(filename.endswith(".toml")):
+        import tomllib
+        with open(filename, "rb") as file: return tomllib.load(file)
+    with open(filename) as file: return json.load(file)
+
+def makeParser():
+    parser = argparse.ArgumentParser(description="Run a disease simulation without the GUI and save its data")
+    parser.add_argument("--config", help="json or toml file of parameters, flags override it")
+    parser.add_argument("--population", type=int, default=1000)
+    parser.add_argument("--virulence", type=float, default=0.8)
+    parser.add_argument("--dti", type=int, default=3, help="avg days till infectious")
+    parser.add_argument("--il", type=int, default=20, help="avg infection length")
+    parser.add_argument("--dc", type=float, default=0.1, help="mortality")
+    parser.add_argument("--engine", choices=engines, default="agent")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-days", type=int, default=-1)
+    parser.add_argument("--out", default="-", help="a .csv or .dsim file, - writes csv to stdout")
+    parser.add_argument("--append", action="store_true", help="add rows to the end of an existing csv instead of replacing it")
+    parser.add_argument("--cache", default=None, help="directory of cached runs, see result_cache.py")
+    return parser
+
+def main(argv=None):
+    parser = makeParser()
+    args, rest = parser.parse_known_args(argv)
+    if(args.config):
+        config = loadConfig(args.config)
+        known = {action.dest for action in parser._actions} - {"help", "config"}
+        unknown = [key for key in config if key not in known]
+        if(unknown): parser.error(f"unknown keys {unknown} in {args.config}, expected some of {sorted(known)}")
+        parser.set_defaults(**config)
+    args = parser.parse_args(argv)
+    if(args.engine not in engines): parser.error(f"unknown engine {args.engine!r}, expected one of {engines}")
+    if(args.out != "-" and not args.out.endswith((".csv", ".dsim"))): parser.error("--out should be a .csv or .dsim file, or - for stdout")
+
+    if(args.cache):
+        from result_cache import ResultCache
+        simData = ResultCache(args.cache).run(args.engine, args.population, args.virulence, args.dti, args.il, args.dc, seed=args.seed, maxLength=args.max_days)
+        if(args.out.endswith(".dsim")):
+            simData.save(args.out)
+        else:
+            from sinks import CSVSink
+            with CSVSink(args.out, append=args.append) as sink:
+                sink.start(simData)
+                for day in range(simData.firstDay, simData.totalDays): sink.write(simData.getDayData(day))
+    elif(args.out.endswith(".dsim")):
+        sim = makeSimulation(args.engine, args.population, args.virulence, args.dti, args.il, args.dc, seed=args.seed)
+        simData = sim.run(args.max_days)
+        simData.save(args.out)
+    else:
+        sim = makeSimulation(args.engine, args.population, args.virulence, args.dti, args.il, args.dc, seed=args.seed)
+        from sinks import CSVSink, stream
+        simData = stream(sim, [CSVSink(args.out, append=args.append)], args.max_days)
+    if(simData.totalDays == 0): return
+    last = simData.getDayData(simData.totalDays - 1)
+    print(f"{simData.totalDays} days (seed {simData.randSeed}): {last['number_immune']} recovered, {last['number_dead']} dead, {last['number_susceptible']} never infected", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import random
+import numpy as np
+from engines import DayLoop
+from simulation_data import SimulationData
+
+'''
+Aggregate version of Simulation, only counts how many people are in each state
+
+Takes the same parameters as Simulation and gives the same SimulationData, but a day
+costs the same however big the population is.
+
+People are split into classes by how easily they get infected, from natural_immunity and
+hygiene (both uniform 0-1), and each class gets its average chances:
+1. contacts: an infectious person makes 4 + 1 = 5 contacts a day on average
+2. infection: a contact with a susceptible person infects them with chance
+   virulence * (1 - natural_immunity) - hygiene * 0.1
+3. death: an infected person dies each day with chance DC / 4 * natural_immunity, averaged
+   over the people in the class who got infected
+
+Modes
+ode: deterministic SEIRD equations with exponential incubation (1 / avgDTI) and
+     recovery (1 / avgIL) rates, integrated with RK4, counts are rounded each day
+tau: stochastic, one binomial draw per state and class a day (tau leaping). Infected
+     people are kept by days infected, so like Simulation they become infectious after
+     exactly avgDTI days and recover avgIL days later
+'''
+
+contactsPerDay = 5
+
+def traitClasses(virulence, DC, numClasses=32, gridSize=200):   # fraction of people, infection chance and daily death chance of each class, and the chances between classes
+    u = (np.arange(gridSize) + 0.5) / gridSize
+    immunity, hygiene = (a.ravel() for a in np.meshgrid(u, u))
+    chance = np.clip(virulence * (1 - immunity) - hygiene * 0.1, 0, 1)
+    order = np.argsort(chance, kind="stable")
+    fractions, infectionChance, deathChance, edges = [], [], [], []
+    for group in np.array_split(order, numClasses):
+        if(fractions): edges.append(chance[group[0]])
+        fractions.append(len(group) / len(order))
+        infectionChance.append(chance[group].mean())
+        weights = chance[group] if chance[group].sum() > 0 else np.ones(len(group))
+        deathChance.append(DC / 4 * (immunity[group] * weights).sum() / weights.sum())
+    return np.array(fractions), np.array(infectionChance), np.array(deathChance), np.array(edges)
+
+def classOf(virulence, natural_immunity, hygiene, edges):   # the class of each person, from their traits
+    chance = np.clip(virulence * (1 - natural_immunity) - hygiene * 0.1, 0, 1)
+    return np.searchsorted(edges, chance, side="right")
+
+class CompartmentSimulation(DayLoop):
+    def __init__(self, population_size, virulence, avgDTI, avgIL, DC, mode="tau", debug=False, seed=None, stepsPerDay=10, numClasses=32):
+        if(mode not in ("ode", "tau")): raise ValueError(f"Unknown mode {mode!r}, expected 'ode' or 'tau'")
+        self.virulence = virulence
+        self.avgDTI = avgDTI
+        self.avgIL = avgIL
+        self.DC = DC
+        self.mode = mode
+        self.debug = debug
+        self.popSize = population_size
+        self.stepsPerDay = stepsPerDay
+        randSeed = seed if seed is not None else random.randint(0, 10000000)
+        self.rng = np.random.default_rng(randSeed)
+        self.simData = SimulationData(population_size, randSeed)
+        self.day = 0
+
+        self.fractions, infectionChance, self.deathChance, self.classEdges = traitClasses(virulence, DC, numClasses)
+        self.beta = contactsPerDay * infectionChance
+        self.recovered = np.zeros(numClasses, dtype=float if mode == "ode" else np.int64)   # by class
+        self.dead = np.zeros(numClasses, dtype=float if mode == "ode" else np.int64)
+        if(mode == "ode"):
+            self.susceptible = self.fractions * (population_size - 1)
+            self.exposed = self.fractions.copy()   # patient zero, spread over the classes
+            self.infectious = np.zeros(numClasses)
+        else:
+            self.susceptible = self.rng.multinomial(population_size - 1, self.fractions)
+            self.ages = np.zeros((numClasses, avgDTI + avgIL + 1), dtype=np.int64)   # ages[c, k]: infected people in class c on their kth day
+            self.ages[self.rng.choice(numClasses, p=self.fractions), 0] = 1
+        self.sc = True
+
+    def counts(self):   # (susceptible, exposed, infectious, recovered, dead)
+        if(self.mode == "ode"):
+            return self.susceptible.sum(), self.exposed.sum(), self.infectious.sum(), self.recovered.sum(), self.dead.sum()
+        return int(self.susceptible.sum()), int(self.ages[:, :self.avgDTI].sum()), int(self.ages[:, self.avgDTI:].sum()), int(self.recovered.sum()), int(self.dead.sum())
+
+    def getStats(self):
+        s, e, i, r, d = (int(round(c)) for c in self.counts())
+        numInfected = e + i
+        numAlive = self.popSize - d
+        if(numInfected == 0 or numAlive == 0):
+            self.sc = False
+        return numInfected, i, r, numAlive, self.popSize
+
+    def derivatives(self, s, e, i, r, d):
+        alive = max(self.popSize - d.sum(), 1e-9)
+        newInfections = self.beta * s * i.sum() / alive
+        return (
+            -newInfections,
+            newInfections - e / self.avgDTI - self.deathChance * e,
+            e / self.avgDTI - i / self.avgIL - self.deathChance * i,
+            i / self.avgIL,
+            self.deathChance * (e + i),
+        )
+
+    def odeTick(self):
+        state = (self.susceptible, self.exposed, self.infectious, self.recovered, self.dead)
+        h = 1 / self.stepsPerDay
+        step = lambda state, k, size: tuple(x + size * dx for x, dx in zip(state, k))
+        for n in range(self.stepsPerDay):
+            k1 = self.derivatives(*state)
+            k2 = self.derivatives(*step(state, k1, h / 2))
+            k3 = self.derivatives(*step(state, k2, h / 2))
+            k4 = self.derivatives(*step(state, k3, h))
+            state = tuple(np.maximum(x + h / 6 * (a + 2 * b + 2 * c + d), 0) for x, a, b, c, d in zip(state, k1, k2, k3, k4))
+        self.susceptible, self.exposed, self.infectious, self.recovered, self.dead = state
+
+    def tauTick(self):
+        ages = np.roll(self.ages, 1, axis=1)   # everyone infected gets a day older
+        ages[:, 0] = 0
+
+        deaths = self.rng.binomial(ages, self.deathChance[:, None])
+        ages -= deaths
+        self.dead += deaths.sum(axis=1)
+
+        self.recovered += ages[:, -1]
+        ages[:, -1] = 0
+
+        infectious = ages[:, self.avgDTI:].sum()
+        alive = self.popSize - int(self.dead.sum())
+        if(alive > 0 and infectious > 0):
+            newInfections = self.rng.binomial(self.susceptible, -np.expm1(-self.beta * infectious / alive))
+            ages[:, 0] = newInfections
+            self.susceptible = self.susceptible - newInfections
+        self.ages = ages
+
+    def dayTick(self):
+        if(self.mode == "ode"): self.odeTick()
+        else: self.tauTick()
+
+        numInfected, numInfectious, numImmune, numAlive, totalPpl = self.getStats()
+        self.simData.addDayData(numInfected, numInfectious, numImmune, numAlive)
+        self.printDay(numInfected, numInfectious, numImmune, numAlive, totalPpl)
+        self.day+=1
@@ -0,0 +1,67 @@
+'''
+Simulation engines by name, so runners can be told which one to use
+
+agent: Simulation, one Person object per person
+event: Simulation in event driven mode
+vector: VectorSimulation, numpy columns
+ode: CompartmentSimulation, deterministic mean field equations
+tau: CompartmentSimulation, stochastic counts, fast for any population size
+hybrid: HybridSimulation, vector while few are infectious and tau in between
+
+The engines are imported when they are made so that runners only load numpy if they need it.
+Every engine runs its days through DayLoop, so run and iterDays behave the same whichever is used.
+'''
+
+from contextlib import closing
+
+engines = ["agent", "event", "vector", "ode", "tau", "hybrid"]
+
+# bump an engine's version when the same parameters and seed would give different results, cached runs are keyed by it
+engineVersions = {"agent": 1, "event": 1, "vector": 1, "ode": 1, "tau": 1, "hybrid": 1}
+
+class DayLoop:   # run and iterDays for an engine with dayTick, day, sc and simData
+    def shouldContinue(self):
+        return self.sc
+
+    def finished(self):   # called once run or iterDays stops, however it stops
+        pass
+
+    def tickDays(self, maxLength=-1):   # ticks a day at a time till the simulation ends or reaches maxLength, yielding the day after each
+        try:
+            while(self.sc and self.day != maxLength):
+                self.dayTick()
+                yield self.day
+        finally:
+            self.finished()
+
+    def run(self, maxLength=-1):
+        with closing(self.tickDays(maxLength)) as days:
+            for day in days: pass
+        return self.simData
+
+    def iterDays(self, maxLength=-1, keepData=True):   # runs the simulation a day at a time, yielding each day's data, see sinks.py
+        with closing(self.tickDays(maxLength)) as days:
+            for day in days:
+                yield self.simData.getDayData(day - 1)
+                if(not keepData): self.simData.forget()
+
+    def printDay(self, numInfected, numInfectious, numImmune, numAlive, totalPpl):
+        if(self.debug): print(f"----\nDay: {self.day}\nNumber Infected: {numInfected}\nNumber Infectious: {numInfectious}\nNumber Immune: {numImmune}\nNumber Alive: {numAlive}\nPopulation Size: {totalPpl}\n----")
+
+def makeSimulation(engine, population_size, virulence, avgDTI, avgIL, DC, seed=None):
+    if(engine == "agent" or engine == "event"):
+        from simulator import Simulation
+        return Simulation(population_size, virulence, avgDTI, avgIL, DC, eventDriven=(engine == "event"), seed=seed)
+    if(engine == "vector"):
+        from vector_simulator import VectorSimulation
+        return VectorSimulation(population_size, virulence, avgDTI, avgIL, DC, seed=seed)
+    if(engine == "ode" or engine == "tau"):
+        from compartment_simulator import CompartmentSimulation
+        return CompartmentSimulation(population_size, virulence, avgDTI, avgIL, DC, mode=engine, seed=seed)
+    if(engine == "hybrid"):
+        from hybrid_simulator import HybridSimulation
+        return HybridSimulation(population_size, virulence, avgDTI, avgIL, DC, seed=seed)
+    raise ValueError(f"Unknown engine {engine!r}, expected one of {engines}")
+
+def runSimulation(engine, population_size, virulence, avgDTI, avgIL, DC, seed=None, maxLength=-1):
+    return makeSimulation(engine, population_size, virulence, avgDTI, avgIL, DC, seed=seed).run(maxLength)
@@ -0,0 +1,157 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+import pandas as pd
+from engines import engines, runSimulation
+from simulation_data import data
+
+metrics = [d for d in data if d != "day"]
+
+'''
+Runs many replicates of the same simulation over a process pool
+
+Every replicate gets its own seed spawned from one numpy SeedSequence, so an ensemble
+can be reproduced from its entropy. Replicates are folded into an EnsembleData as they
+finish and then thrown away, so memory does not grow with the number of replicates.
+'''
+
+class Ensemble:
+    def __init__(self, population_size, virulence, avgDTI, avgIL, DC, engine="vector", seed=None, maxLength=-1, workers=None):
+        if(engine not in engines): raise ValueError(f"Unknown engine {engine!r}, expected one of {engines}")
+        self.popSize = population_size
+        self.virulence = virulence
+        self.avgDTI = avgDTI
+        self.avgIL = avgIL
+        self.DC = DC
+        self.engine = engine
+        self.seedSequence = np.random.SeedSequence(seed)
+        self.maxLength = maxLength
+        self.workers = workers or os.cpu_count()
+
+    def seeds(self, replicates):
+        return [int(s.generate_state(1)[0]) for s in self.seedSequence.spawn(replicates)]
+
+    def runReplicate(self, pool, seed):
+        args = (self.engine, self.popSize, self.virulence, self.avgDTI, self.avgIL, self.DC, seed, self.maxLength)
+        if(pool is None): return runSimulation(*args)
+        return pool.submit(runSimulation, *args)
+
+    def run(self, replicates, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        ensembleData = EnsembleData(self.popSize, quantiles, self.seedSequence.entropy)
+        if(self.workers == 1):
+            for seed in self.seeds(replicates):
+                ensembleData.addReplicate(self.runReplicate(None, seed))
+            return ensembleData
+
+        with ProcessPoolExecutor(self.workers) as pool:
+            pending = set()
+            for seed in self.seeds(replicates):
+                if(len(pending) >= self.workers * 2):   # only keep a few replicates in flight
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done: ensembleData.addReplicate(future.result())
+                pending.add(self.runReplicate(pool, seed))
+            for future in wait(pending).done:
+                ensembleData.addReplicate(future.result())
+        return ensembleData
+
+'''
+Mean and quantile curves of many replicates
+
+Every count is between 0 and the population size, so for each day and column a histogram
+of the replicates' counts is kept. The bins are exact up to maxBins - 1 people, above that
+each bin covers several counts. A replicate that has ended keeps its last day's counts for
+the rest of the ensemble, which is stored once, on the day it ended, in ending.
+'''
+
+class EnsembleData():
+    def __init__(self, populationSize, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), entropy=None, maxBins=1024):
+        self.popSize = populationSize
+        self.quantiles = quantiles
+        self.entropy = entropy
+        self.binWidth = max(1, -(-(populationSize + 1) // maxBins))
+        self.numBins = populationSize // self.binWidth + 1
+        self.replicates = 0
+        self.totalDays = 0
+        self.lengths = []
+        self.running = np.zeros((0, len(metrics), self.numBins), dtype=np.int32)
+        self.ending = np.zeros((0, len(metrics), self.numBins), dtype=np.int32)
+        self.runningSums = np.zeros((0, len(metrics)))
+        self.endingSums = np.zeros((0, len(metrics)))
+
+    def grow(self, days):
+        if(days <= len(self.running)): return
+        capacity = max(days, 2 * len(self.running))
+        for name in ("running", "ending", "runningSums", "endingSums"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def addReplicate(self, simData):
+        values = np.array([simData.getDataXY("day", m)[1] for m in metrics], dtype=np.int64).T
+        numDays = len(values)
+        if(numDays == 0): return
+        self.grow(numDays + 1)
+
+        columns = np.arange(len(metrics))
+        bins = values // self.binWidth
+        self.running[np.arange(numDays)[:, None], columns, bins] += 1
+        self.runningSums[:numDays] += values
+        self.ending[numDays, columns, bins[-1]] += 1
+        self.endingSums[numDays] += values[-1]
+
+        self.totalDays = max(self.totalDays, numDays)
+        self.lengths.append(numDays)
+        self.replicates += 1
+
+    def histograms(self):
+        return self.running[:self.totalDays] + np.cumsum(self.ending[:self.totalDays], axis=0)
+
+    def getMeans(self):
+        return (self.runningSums[:self.totalDays] + np.cumsum(self.endingSums[:self.totalDays], axis=0)) / max(self.replicates, 1)
+
+    def getQuantiles(self, q):
+        cdf = np.cumsum(self.histograms(), axis=-1)
+        return np.argmax(cdf >= q * self.replicates, axis=-1) * self.binWidth
+
+    def getColumns(self):
+        columns = {"day": np.arange(self.totalDays)}
+        means = self.getMeans()
+        quantiles = [self.getQuantiles(q) for q in self.quantiles]
+        for i, m in enumerate(metrics):
+            columns[f"{m}_mean"] = means[:, i]
+            for q, values in zip(self.quantiles, quantiles):
+                columns[f"{m}_q{q:g}"] = values[:, i]
+        return columns
+
+    def getDataXY(self, x_type, y_type):
+        columns = self.getColumns()
+        return (list(columns[x_type]), list(columns[y_type]))
+
+    def exportDataAsCSV(self, filename):
+        df = pd.DataFrame(self.getColumns())
+        df.to_csv(filename, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many replicates of a disease simulation and save mean and quantile curves")
+    parser.add_argument("--population", type=int, default=1000)
+    parser.add_argument("--virulence", type=float, default=0.8)
+    parser.add_argument("--dti", type=int, default=3, help="avg days till infectious")
+    parser.add_argument("--il", type=int, default=20, help="avg infection length")
+    parser.add_argument("--dc", type=float, default=0.1, help="mortality")
+    parser.add_argument("--replicates", type=int, default=500)
+    parser.add_argument("--engine", choices=engines, default="vector")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-days", type=int, default=-1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="ensemble.csv")
+    args = parser.parse_args()
+
+    ensemble = Ensemble(args.population, args.virulence, args.dti, args.il, args.dc, engine=args.engine, seed=args.seed, maxLength=args.max_days, workers=args.workers)
+    ensembleData = ensemble.run(args.replicates)
+    ensembleData.exportDataAsCSV(args.out)
+    print(f"Ran {ensembleData.replicates} replicates over {ensembleData.totalDays} days (entropy {ensembleData.entropy}), saved to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 from simulator import Simulation
+from simulation_data import SimulationData
 import tkinter as tk
+import tkinter.messagebox
 from tkinter.filedialog import askopenfilename, asksaveasfilename
 import pickle
+import queue
+import threading
+import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
+plotted = [("number_susceptible", "go-", "susceptible"), ("number_infected", "ro-", "Infected"), ("number_immune", "bo-", "Recovered")]
+
 class Window(tk.Tk):
     def __init__(self, *args, **kwargs):
         tk.Tk.__init__(self, *args, **kwargs)
@@ -27,10 +34,13 @@ class Window(tk.Tk):
         self.frames[SimulationScreen].setSimData(simData)
     
     def loadSimData(self):
-        fn = askopenfilename(title="Select Simulation Data File", filetypes = (("Pickle Files", ".pickle .pkl"),))
+        fn = askopenfilename(title="Select Simulation Data File", filetypes = (("Simulation Data Files", ".dsim"), ("Pickle Files (legacy)", ".pickle .pkl")))
         if(fn == ""): return
-        with open(fn, "rb") as file:
-            self.setSimData(pickle.load(file))
+        if(fn.endswith((".pickle", ".pkl"))):   # only load pickles you trust, they can run code
+            with open(fn, "rb") as file:
+                self.setSimData(pickle.load(file))
+        else:
+            self.setSimData(SimulationData.load(fn))
         self.show_frame(SimulationScreen)
     
     def show_frame(self, cont):
@@ -127,12 +137,20 @@ class SimulationScreen(tk.Frame):
         self.virulence.insert(0, "0.8")
         self.virulence.pack(padx=10, pady=2, side="bottom")
 
-        runSimButton = tk.Button(
+        self.cancelSimButton = tk.Button(
+            self,
+            text="Cancel Simulation",
+            state="disabled",
+            command=lambda: self.cancelSim()
+        )
+        self.cancelSimButton.pack(side="bottom", fill=tk.X, padx=20, pady=10)
+
+        self.runSimButton = tk.Button(
             self,
             text="Run New Simulation",
             command=lambda: self.runNewSim()
         )
-        runSimButton.pack(side="bottom", fill=tk.X, padx=20, pady=10)
+        self.runSimButton.pack(side="bottom", fill=tk.X, padx=20, pady=10)
 
         SaveAsCSV = tk.Button(
             self,
@@ -158,6 +176,8 @@ class SimulationScreen(tk.Frame):
         self.databox = tk.Label(self)
         self.databox.pack()
 
+        self.simThread = None
+
     def validateInteger(self, s):
         if(s == ""): return True
         try:
@@ -183,47 +203,120 @@ class SimulationScreen(tk.Frame):
         if(il == ""):self.IL.insert(0,"20")
         if(v == ""): self.virulence.insert(0,"0.8")
         if(dc == ""): self.DC.insert(0,"0.1")
-        ns = Simulation(int(ps), float(v), int(dti), int(il), float(dc), debug=False)
-        sd = ns.run()
+        ps, v, dti, il, dc = self.popSize.get(), self.virulence.get(), self.DTI.get(), self.IL.get(), self.DC.get()
+
+        self.simThread = SimulationThread(lambda: Simulation(int(ps), float(v), int(dti), int(il), float(dc), debug=False))
+        self.simThread.start()
+        self.runSimButton.config(state="disabled")
+        self.cancelSimButton.config(state="normal")
+        self.databox.config(text="Setting up simulation...")
+        self.after(SimulationThread.pollInterval, self.pollSim)
+
+    def cancelSim(self):
+        if(self.simThread): self.simThread.cancel()
+
+    def pollSim(self):
+        latest = None
+        while(True):
+            try: latest = self.simThread.progress.get_nowait()
+            except queue.Empty: break
+        if(latest):
+            day, simData = latest
+            counts = simData.getDayData(simData.totalDays - 1)
+            self.databox.config(text=f"Day {day}: {counts['number_susceptible']} susceptible, {counts['number_infected']} infected, {counts['number_immune']} recovered, {counts['number_dead']} dead")
+            self.setSimData(simData, live=True)
+
+        if(self.simThread.is_alive()):
+            self.after(SimulationThread.pollInterval, self.pollSim)
+            return
+
+        self.runSimButton.config(state="normal")
+        self.cancelSimButton.config(state="disabled")
+        if(self.simThread.error):
+            tk.messagebox.showerror("Simulation failed", str(self.simThread.error))
+            return
+        if(self.simThread.cancelled.is_set()):
+            self.databox.config(text=self.databox.cget("text") + " (cancelled)")
         print("Done running sim")
-        self.setSimData(sd)
+        self.setSimData(self.simThread.simulation.simData)
 
-    def setSimData(self, sd):
+    def setSimData(self, sd, live=False):
         self.simData = sd
-        self.reloadSimulation()
-    
-    def reloadSimulation(self):
-        if(self.fig):
-            self.fig = None
-            self.canvas.get_tk_widget().destroy()
-            self.canvas = None
+        self.reloadSimulation(live)
+
+    '''
+    The figure and its lines are made once. Reloading sets the lines' data and, unless the
+    axes have to change, only redraws the lines over a saved copy of the rest of the figure
+    (blitting). Lines are cut down to two points per pixel of the axes and lose their
+    markers once they are too close together, so a redraw costs the same however many days
+    there are. While a simulation is running (live) the axes are given room to grow into so
+    they rarely need redrawing.
+    '''
+
+    def makeFigure(self):
         self.fig = Figure(figsize=(5, 4), dpi=100)
-        ax = self.fig.add_subplot(111)
-        x, y = self.simData.getDataXY("day", "number_infected")
-        x2, y2 = self.simData.getDataXY("day", "number_immune")
-        x3, y3 = self.simData.getDataXY("day", "number_susceptible")
-        sur = ax.plot(x3, y3, "go-", linewidth=2, markersize=4, label="susceptible")
-        inf = ax.plot(x, y, "ro-", linewidth=2, markersize=4, label="Infected")
-        imm = ax.plot(x2, y2, "bo-", linewidth=2, markersize=4, label="Recovered")
-        ax.legend()
-
-        ax.set_title("Number of SIR by day")
-        ax.set_xlabel("Day")
-        ax.set_ylabel("Number of inected/immune")
+        self.ax = self.fig.add_subplot(111)
+        self.lines = {}
+        for name, style, label in plotted:
+            self.lines[name], = self.ax.plot([], [], style, linewidth=2, markersize=4, label=label, animated=True)
+        self.ax.legend()
 
+        self.ax.set_title("Number of SIR by day")
+        self.ax.set_xlabel("Day")
+        self.ax.set_ylabel("Number of inected/immune")
+
+        self.background = None
         self.canvas = FigureCanvasTkAgg(self.fig, self.data_frame)
-        self.canvas.draw()
+        self.canvas.mpl_connect("draw_event", self.onDraw)
         self.canvas.get_tk_widget().pack(side="right")
+
+    def onDraw(self, event):   # after a full redraw (new axes, resizing), save the figure without the lines
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.drawLines()
+
+    def drawLines(self):
+        for line in self.lines.values():
+            self.ax.draw_artist(line)
+
+    def reloadSimulation(self, live=False):
+        if(self.fig is None): self.makeFigure()
+        x = self.simData.getColumn("day")
+        width = max(int(self.ax.bbox.width), 100)
+        top = 1
+        for name, line in self.lines.items():
+            y = self.simData.getColumn(name)
+            line.set_data(*minMaxDecimate(x, y, width))
+            line.set_marker("o" if len(y) <= width // 4 else "")   # markers only while they can be told apart
+            if(len(y)): top = max(top, int(y.max()))
+
+        first, last = (int(x[0]), int(x[-1])) if len(x) else (0, 1)
+        (left, right), (bottom, ceiling) = self.ax.get_xlim(), self.ax.get_ylim()
+        if(not live):
+            limits = ((first, max(last, first + 1)), (0, top * 1.05))
+        elif(first < left or last > right or top > ceiling or right > 4 * (last - first + 10)):   # grow by half again, or start over for a new run
+            limits = ((first, first + (last - first + 10) * 1.5), (0, top * 1.1))
+        else:
+            limits = None
+
+        if(limits is not None or self.background is None):
+            if(limits is not None):
+                self.ax.set_xlim(*limits[0])
+                self.ax.set_ylim(*limits[1])
+            self.canvas.draw()   # onDraw saves the new background and draws the lines
+            return
+        self.canvas.restore_region(self.background)
+        self.drawLines()
+        self.canvas.blit(self.fig.bbox)
     
     def saveSim(self):
         if(self.simData == None): 
             tk.messagebox.showerror("Unable to save Simulation Data", "No simulation data currently exists. Please make a new simulation or load a simulation first.")
             return
-        fn = asksaveasfilename(title="Select Simulation Data File", filetypes = (("Pickle Files", ".pickle .pkl"),))
+        fn = asksaveasfilename(title="Select Simulation Data File", filetypes = (("Simulation Data Files", ".dsim"),), defaultextension=".dsim")
         if(fn == ""): 
             tk.messagebox.showerror("Please select a valid file")
             return
-        pickle.dump(self.simData, open(fn, "wb"))
+        self.simData.save(fn)
 
     def saveAsCSV(self):
         if(self.simData == None):
@@ -235,6 +328,50 @@ class SimulationScreen(tk.Frame):
         self.simData.exportDataAsCSV(fn)
 
 
+def minMaxDecimate(x, y, buckets):   # keeps the lowest and highest point of each of buckets slices, in order, so spikes still show
+    n = len(x)
+    if(n <= 2 * buckets): return x, y
+    size = -(-n // buckets)
+    padded = np.concatenate((y, np.repeat(y[-1:], size * buckets - n))).reshape(buckets, size)
+    offsets = np.arange(buckets)[:, None] * size
+    keep = np.sort(np.stack((padded.argmin(axis=1), padded.argmax(axis=1)), axis=1), axis=1) + offsets
+    keep = np.append(np.minimum(keep.ravel(), n - 1), n - 1)   # and the last point, so the line reaches the latest day
+    return x[keep], y[keep]
+
+
+'''
+Runs a simulation outside of the tk main loop
+
+The simulation is made and run in the thread. After a day, if the GUI has picked up the
+last one, the day and a copy of the SimulationData are put in progress for the GUI to pick
+up with after(). The copy is the thread's own, so the GUI never reads columns the thread is
+still adding to, and copies are only made as often as the GUI polls. cancel() stops the run
+after the current day.
+'''
+
+class SimulationThread(threading.Thread):
+    pollInterval = 200   # ms between the GUI checking on the thread
+
+    def __init__(self, makeSimulation):
+        threading.Thread.__init__(self, daemon=True)
+        self.makeSimulation = makeSimulation
+        self.simulation = None
+        self.progress = queue.Queue()
+        self.cancelled = threading.Event()
+        self.error = None
+
+    def run(self):
+        try:
+            self.simulation = self.makeSimulation()
+            while(self.simulation.shouldContinue() and not self.cancelled.is_set()):
+                self.simulation.dayTick()
+                if(self.progress.empty()): self.progress.put((self.simulation.day, self.simulation.simData.copy()))
+        except Exception as e:
+            self.error = e
+
+    def cancel(self):
+        self.cancelled.set()
+
 
 '''
 Inspiration taken from
@@ -0,0 +1,95 @@
+import numpy as np
+from compartment_simulator import CompartmentSimulation, classOf
+from engines import DayLoop
+from vector_simulator import VectorSimulation
+
+'''
+VectorSimulation while there are few infectious people, CompartmentSimulation (tau mode)
+while there are many
+
+An outbreak starts with agents, so it can die out early the way it does in the agent
+engines. Once aggregateAt people are infectious the agents are counted into the
+compartment classes and the epidemic carries on as counts, which costs the same each day
+however big the population is. When fewer than disaggregateAt are infectious again the
+counts are handed back out to the agents for the tail. Both engines add their days to the
+same SimulationData, so the series does not show the switches.
+
+Going back to agents, each class's people are reassigned to match its counts: the ones
+still susceptible are picked from the people who were susceptible when the agents were
+aggregated, and the rest of them, and the people who were infected then, are shared out
+between the infected days, recovered and dead. People keep their traits, so someone is
+only ever moved between people of the same class.
+'''
+
+class HybridSimulation(DayLoop):
+    def __init__(self, population_size, virulence, avgDTI, avgIL, DC, debug=False, seed=None, aggregateAt=1000, disaggregateAt=None):
+        self.agents = VectorSimulation(population_size, virulence, avgDTI, avgIL, DC, debug=debug, seed=seed)
+        self.compartments = CompartmentSimulation(population_size, virulence, avgDTI, avgIL, DC, mode="tau", debug=debug, seed=seed)
+        self.compartments.rng = self.agents.rng   # one random stream for the whole run
+        self.simData = self.agents.simData
+        self.compartments.simData = self.simData
+        self.aggregateAt = aggregateAt
+        self.disaggregateAt = disaggregateAt if disaggregateAt is not None else aggregateAt // 4
+        self.popSize = population_size
+        self.classes = classOf(virulence, self.agents.natural_immunity, self.agents.hygiene, self.compartments.classEdges)
+        self.numClasses = len(self.compartments.fractions)
+        self.byClass = np.argsort(self.classes, kind="stable")   # everyone in class c is byClass[classStart[c]:classStart[c + 1]]
+        self.classStart = np.concatenate(([0], np.cumsum(np.bincount(self.classes, minlength=self.numClasses))))
+        self.engine = self.agents
+        self.switches = []   # (day, "compartments" or "agents")
+        self.day = 0
+        self.sc = True
+
+    def aggregate(self):   # agents to counts
+        agents, compartments = self.agents, self.compartments
+        count = lambda mask: np.bincount(self.classes[mask], minlength=self.numClasses)
+        compartments.susceptible = count(~(agents.infected | agents.immune | agents.dead))
+        compartments.recovered = count(agents.immune)
+        compartments.dead = count(agents.dead)
+        sick = np.flatnonzero(agents.infected)
+        ages = np.bincount(self.classes[sick] * compartments.ages.shape[1] + agents.daysInfected[sick], minlength=compartments.ages.size)
+        compartments.ages = ages.reshape(compartments.ages.shape)
+        compartments.day = self.day
+        compartments.sc = True
+        self.engine = compartments
+
+    def disaggregate(self):   # counts back to agents
+        agents, compartments = self.agents, self.compartments
+        rng = agents.rng
+        susceptible = ~(agents.infected | agents.immune | agents.dead)
+        changing = agents.infected.copy()   # people who may have changed state since the agents were aggregated
+        for c in range(self.numClasses):
+            members = self.byClass[self.classStart[c]:self.classStart[c + 1]]
+            people = rng.permutation(members[susceptible[members]])
+            changing[people[compartments.susceptible[c]:]] = True
+
+        agents.infected[changing] = False
+        agents.infectious[changing] = False
+        agents.daysInfected[changing] = 0
+        numDays = compartments.ages.shape[1]
+        for c in range(self.numClasses):
+            members = self.byClass[self.classStart[c]:self.classStart[c + 1]]
+            people = rng.permutation(members[changing[members]])
+            newlyDead = compartments.dead[c] - np.count_nonzero(agents.dead[members])
+            newlyRecovered = compartments.recovered[c] - np.count_nonzero(agents.immune[members])
+            agents.dead[people[:newlyDead]] = True
+            agents.immune[people[newlyDead:newlyDead + newlyRecovered]] = True
+            sick = people[newlyDead + newlyRecovered:]
+            agents.infected[sick] = True
+            agents.daysInfected[sick] = np.repeat(np.arange(numDays), compartments.ages[c])
+        agents.infectious[:] = agents.infected & (agents.daysInfected >= agents.avgDTI)
+        agents.day = self.day
+        agents.sc = True
+        self.engine = agents
+
+    def dayTick(self):
+        self.engine.dayTick()
+        self.day += 1
+        self.sc = self.engine.sc
+        numInfectious = self.simData.getDayData(self.day - 1)["number_infectious"]
+        if(self.sc and self.engine is self.agents and numInfectious >= self.aggregateAt):
+            self.aggregate()
+            self.switches.append((self.day, "compartments"))
+        elif(self.sc and self.engine is self.compartments and numInfectious < self.disaggregateAt):
+            self.disaggregate()
+            self.switches.append((self.day, "agents"))
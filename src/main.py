@@ -1,5 +1,10 @@
-from gui import Window
+import sys
 
 if __name__ == "__main__":
-    obj = Window()
-    obj.mainloop()
\ No newline at end of file
+    if(len(sys.argv) > 1):   # any arguments run the simulation headless, see cli.py
+        from cli import main
+        main()
+    else:
+        from gui import Window
+        obj = Window()
+        obj.mainloop()
@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+import numpy as np
+from simulation_data import SimulationData
+from vector_simulator import VectorSimulation
+
+'''
+Many regions, each its own VectorSimulation, coupled by travel
+
+regions is a list of (population_size, virulence, avgDTI, avgIL, DC) and mobility[r][s] is
+the chance an infectious person in region r spends the day in region s. Each infectious
+person goes to at most one other region a day. Travellers make their contacts only in the
+region they visit, and then go home, so region populations do not change. Only patient
+zero's region starts with an infection.
+
+The regions are split between worker processes which keep them for the whole run. Each
+day every worker ticks its regions and sends back their infectious counts, then the number
+of travellers between every pair of regions is drawn and handed out as visitors for the
+next day, along with how many of each region's own infectious people are away.
+'''
+
+class RegionGroup:   # the regions one worker looks after
+    def __init__(self, regions, seeds, patientZero):
+        self.sims = [VectorSimulation(*region, seed=seed) for region, seed in zip(regions, seeds)]
+        for sim, hasPatientZero in zip(self.sims, patientZero):
+            if(not hasPatientZero): sim.infected[0] = False   # regions start clean and get infected by visitors
+
+    def tick(self, travel):   # (visitors, away) for each region
+        for sim, (numVisitors, numAway) in zip(self.sims, travel):
+            sim.dayTick(numVisitors, numAway)
+        days = [sim.simData.getDayData(sim.day - 1) for sim in self.sims]
+        return [(day["number_infected"], day["number_infectious"]) for day in days]
+
+    def results(self):
+        return [sim.simData for sim in self.sims]
+
+def regionWorker(conn, regions, seeds, patientZero):
+    group = RegionGroup(regions, seeds, patientZero)
+    while(True):
+        command, arg = conn.recv()
+        if(command == "tick"):
+            conn.send(group.tick(arg))
+        elif(command == "results"):
+            conn.send(group.results())
+            return
+
+class Metapopulation:
+    def __init__(self, regions, mobility, patientZeroRegion=0, seed=None, workers=None):
+        self.regions = [tuple(region) for region in regions]
+        self.mobility = np.asarray(mobility, dtype=float)
+        if(self.mobility.shape != (len(self.regions), len(self.regions))):
+            raise ValueError(f"mobility should be {len(self.regions)}x{len(self.regions)}, got {self.mobility.shape}")
+        if((self.mobility.sum(axis=1) > 1).any()):
+            raise ValueError("each row of mobility is a set of chances and should add up to at most 1")
+        self.patientZeroRegion = patientZeroRegion
+        seedSequence = np.random.SeedSequence(seed)
+        self.randSeed = seedSequence.entropy
+        travelSeed, *regionSeeds = seedSequence.spawn(len(self.regions) + 1)
+        self.regionSeeds = [int(s.generate_state(1)[0]) for s in regionSeeds]
+        self.rng = np.random.default_rng(travelSeed)
+        self.workers = min(workers or os.cpu_count(), len(self.regions))
+        self.day = 0
+
+    def travel(self, infectious):   # visitors arriving in each region and its own people away
+        chances = self.mobility.copy()
+        np.fill_diagonal(chances, 0)
+        chances = np.hstack((chances, np.maximum(0, 1 - chances.sum(axis=1))[:, None]))   # last column stays home
+        travellers = self.rng.multinomial(np.asarray(infectious), chances)[:, :-1]
+        return travellers.sum(axis=0), travellers.sum(axis=1)
+
+    def run(self, maxLength=-1):   # returns each region's SimulationData
+        chunks = np.array_split(np.arange(len(self.regions)), self.workers)
+        conns, processes = [], []
+        for chunk in chunks:
+            parent, child = multiprocessing.Pipe()
+            args = ([self.regions[r] for r in chunk], [self.regionSeeds[r] for r in chunk], [r == self.patientZeroRegion for r in chunk])
+            process = multiprocessing.Process(target=regionWorker, args=(child,) + args, daemon=True)
+            process.start()
+            conns.append(parent)
+            processes.append(process)
+
+        try:
+            visitors = away = np.zeros(len(self.regions), dtype=np.int64)
+            while(self.day != maxLength):
+                for conn, chunk in zip(conns, chunks):
+                    conn.send(("tick", list(zip(visitors[chunk].tolist(), away[chunk].tolist()))))
+                stats = [s for conn in conns for s in conn.recv()]
+                self.day += 1
+                infected = np.array([s[0] for s in stats])
+                infectious = np.array([s[1] for s in stats])
+                visitors, away = self.travel(infectious)
+                if(infected.sum() == 0): break
+
+            for conn in conns:
+                conn.send(("results", None))
+            results = [simData for conn in conns for simData in conn.recv()]
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if(process.is_alive()): process.terminate()
+        return results
+
+def combineRegions(results, randSeed=None):   # one SimulationData for all regions added together
+    total = SimulationData(sum(simData.popSize for simData in results), randSeed)
+    for day in range(max(simData.totalDays for simData in results)):
+        sums = [0, 0, 0, 0]
+        for simData in results:
+            last = simData.getDayData(min(day, simData.totalDays - 1))
+            sums[0] += last["number_infected"]
+            sums[1] += last["number_infectious"]
+            sums[2] += last["number_immune"]
+            sums[3] += last["number_alive"]
+        total.addDayData(*sums)
+    return total
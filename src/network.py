@@ -0,0 +1,87 @@
+import numpy as np
+
+'''
+Contact networks for VectorSimulation, stored as compressed sparse row arrays
+
+The neighbours of person i are indices[indptr[i]:indptr[i + 1]], so looking up everyone an
+infectious person can meet is one contiguous slice. Edges are undirected, each one is
+stored in both directions, and there are no self loops or repeated edges.
+
+The generators take a seed or numpy Generator as rng and build the graph with numpy, so
+a million people with ten million edges takes seconds.
+'''
+
+class ContactNetwork:
+    def __init__(self, indptr, indices):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.size = len(self.indptr) - 1
+
+    @classmethod
+    def fromEdges(cls, size, u, v):
+        keep = np.flatnonzero(np.asarray(u) != np.asarray(v))
+        u = np.asarray(u)[keep].astype(np.int64)
+        v = np.asarray(v)[keep].astype(np.int64)
+        del keep
+        keys = np.empty(2 * len(u), dtype=np.int64)   # person * size + neighbour, both directions
+        np.multiply(u, size, out=keys[:len(u)])
+        keys[:len(u)] += v
+        np.multiply(v, size, out=keys[len(u):])
+        keys[len(u):] += u
+        del u, v
+        keys.sort()   # by person, then neighbour
+        repeated = np.flatnonzero(keys[1:] == keys[:-1])
+        keys = np.delete(keys, repeated + 1)
+        del repeated
+
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // size, minlength=size), out=indptr[1:])
+        np.remainder(keys, size, out=keys)
+        return cls(indptr, keys.astype(np.int32))
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def neighbours(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def numEdges(self):
+        return len(self.indices) // 2
+
+def erdosRenyi(size, meanDegree, rng=None):   # about size * meanDegree / 2 edges between random pairs
+    rng = np.random.default_rng(rng)
+    numEdges = int(size * meanDegree / 2)
+    return ContactNetwork.fromEdges(size, rng.integers(0, size, numEdges), rng.integers(0, size, numEdges))
+
+def barabasiAlbert(size, m, rng=None):   # preferential attachment, each new person links to m others
+    # Batagelj and Brandes: edge e goes from person e // m to the person at a random earlier
+    # position of the list of every edge's ends, so people are picked in proportion to degree
+    rng = np.random.default_rng(rng)
+    numEdges = size * m
+    edges = np.arange(numEdges, dtype=np.int64)
+    picks = (rng.random(numEdges) * (2 * edges + 1)).astype(np.int64)
+    ends = picks.copy()
+    odd = np.flatnonzero(ends % 2 == 1)
+    while(odd.size):   # an odd position is the far end of an earlier edge, follow it back
+        ends[odd] = picks[(ends[odd] - 1) // 2]
+        odd = odd[ends[odd] % 2 == 1]
+    return ContactNetwork.fromEdges(size, edges // m, (ends // 2) // m)
+
+def smallWorld(size, k, p, rng=None):   # Watts-Strogatz: a ring joined to the k nearest people, each edge rewired with chance p
+    rng = np.random.default_rng(rng)
+    u = np.repeat(np.arange(size, dtype=np.int64), k // 2)
+    v = (u + np.tile(np.arange(1, k // 2 + 1), size)) % size
+    rewire = rng.random(len(v)) < p
+    v[rewire] = rng.integers(0, size, np.count_nonzero(rewire))
+    return ContactNetwork.fromEdges(size, u, v)
+
+def householdsAndWorkplaces(size, householdSize=3, workplaceSize=10, rng=None):   # everyone knows everyone in their household and workplace
+    rng = np.random.default_rng(rng)
+    u, v = [], []
+    for groupSize, members in ((householdSize, np.arange(size)), (workplaceSize, rng.permutation(size))):
+        group = np.arange(size) // groupSize
+        for offset in range(1, groupSize):   # join each member to the member offset places after them in the same group
+            same = np.flatnonzero(group[:size - offset] == group[offset:])
+            u.append(members[same])
+            v.append(members[same + offset])
+    return ContactNetwork.fromEdges(size, np.concatenate(u), np.concatenate(v))
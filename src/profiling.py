@@ -0,0 +1,65 @@
+import csv
+from contextlib import contextmanager
+from time import perf_counter
+
+phases = ["progression", "contacts", "infection", "scheduling", "stats", "record"]
+
+'''
+Wall time spent in each phase of a simulation day, for Simulation(profile=True)
+
+progression: days infected, deaths, becoming infectious and recovering
+contacts: picking who an infectious person meets
+infection: infection draws for those contacts
+scheduling: queueing the events of newly infected people (event driven mode only)
+stats: getStats
+record: adding the day to SimulationData
+
+calls counts the timed sections of each phase, so it is people for progression in tick mode
+and days in event driven mode. attempts counts contacts with someone other than the
+spreader and infections the ones that infected someone new. Every day's share is kept as
+well as the totals, and exportDataAsCSV writes one row per day with a day column so it can
+be lined up with SimulationData's.
+'''
+
+class PhaseProfile:
+    def __init__(self):
+        self.seconds = dict.fromkeys(phases, 0.0)
+        self.calls = dict.fromkeys(phases, 0)
+        self.attempts = 0
+        self.infections = 0
+        self.days = []
+        self.lastTotals = self.totals()
+
+    @contextmanager
+    def phase(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += perf_counter() - start
+            self.calls[name] += 1
+
+    def totals(self):
+        totals = {f"{phase}_seconds": self.seconds[phase] for phase in phases}
+        totals.update({f"{phase}_calls": self.calls[phase] for phase in phases})
+        totals["attempts"] = self.attempts
+        totals["infections"] = self.infections
+        return totals
+
+    def endDay(self, day):   # keep what was spent since the last day
+        totals = self.totals()
+        self.days.append({"day": day, **{name: value - self.lastTotals[name] for name, value in totals.items()}})
+        self.lastTotals = totals
+
+    def exportDataAsCSV(self, filename):
+        with open(filename, "w", newline="") as file:
+            writer = csv.DictWriter(file, ["day"] + list(self.lastTotals))
+            writer.writeheader()
+            writer.writerows(self.days)
+
+    def __repr__(self):
+        total = sum(self.seconds.values()) or 1
+        lines = [f"{phase:>12} {self.seconds[phase]:9.3f}s {self.seconds[phase] / total:6.1%} {self.calls[phase]:>10} calls" for phase in phases]
+        rate = self.infections / self.attempts if self.attempts else 0
+        lines.append(f"{self.infections} infections from {self.attempts} attempts ({rate:.1%})")
+        return "\n".join(lines)
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from engines import engineVersions, engines, runSimulation
+from simulation_data import SimulationData
+
+'''
+Finished runs saved on disk, so asking for the same run again loads it instead
+
+A run is keyed by a sha256 of the engine, its version in engineVersions, the parameters,
+the seed and maxLength, and saved as <key[:2]>/<key>.dsim in the cache directory. Runs
+without a seed are random, so they are never cached.
+
+Using a run sets its file's modified time, and when the files add up to more than
+maxBytes the least recently used ones are deleted.
+
+Asking for a run that is already being made waits for it instead of making it again.
+Threads of one process share a Future, and other processes see a <key>.lock file, made
+by whoever is running it, and wait for the .dsim to appear. The running process touches
+its lock every lockTimeout / 4 seconds, so a lock untouched for lockTimeout seconds belongs
+to a process that died and is taken over.
+
+The cache's size is counted once, then kept up to date as runs are saved. The directory is
+only scanned again when the count goes over maxBytes, which also catches runs that other
+processes saved.
+'''
+
+class ResultCache:
+    pollInterval = 0.05   # seconds between checks while another process makes a run
+
+    def __init__(self, directory, maxBytes=1 << 30, lockTimeout=3600):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.lockTimeout = lockTimeout
+        self.hits = 0
+        self.misses = 0
+        self.running = {}   # key: Future, for runs this process is making
+        self.totalBytes = None   # size of the cached runs, counted on the first put
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, engine, population_size, virulence, avgDTI, avgIL, DC, seed, maxLength=-1):
+        if(engine not in engines): raise ValueError(f"Unknown engine {engine!r}, expected one of {engines}")
+        # numpy numbers are not json, and DC=0 and DC=0.0 are the same run
+        parameters = [engine, engineVersions[engine], int(population_size), float(virulence), int(avgDTI), int(avgIL), float(DC), int(seed), int(maxLength)]
+        return hashlib.sha256(json.dumps(parameters).encode()).hexdigest()
+
+    def path(self, key, extension=".dsim"):
+        return os.path.join(self.directory, key[:2], key + extension)
+
+    def get(self, key):   # the cached SimulationData, or None
+        try:
+            simData = SimulationData.load(self.path(key), mmap=False)
+        except FileNotFoundError:
+            return None
+        try: os.utime(self.path(key))
+        except FileNotFoundError: pass   # evicted while it was loaded
+        return simData
+
+    def put(self, key, simData):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        simData.save(temp)
+        size = os.path.getsize(temp)
+        os.replace(temp, path)
+        with self.lock:
+            if(self.totalBytes is None): self.evict()
+            else: self.totalBytes += size
+            if(self.totalBytes > self.maxBytes): self.evict()
+
+    def evict(self):   # deletes the least recently used runs until the cache fits in maxBytes
+        files = []
+        for entry in os.scandir(self.directory):
+            if(not entry.is_dir()): continue
+            for file in os.scandir(entry.path):
+                if(file.name.endswith(".dsim")):
+                    stat = file.stat()
+                    files.append((stat.st_mtime, stat.st_size, file.path))
+        total = sum(size for mtime, size, path in files)
+        for mtime, size, path in sorted(files):
+            if(total <= self.maxBytes): break
+            try: os.remove(path)
+            except FileNotFoundError: pass
+            total -= size
+        self.totalBytes = total
+
+    def run(self, engine, population_size, virulence, avgDTI, avgIL, DC, seed=None, maxLength=-1):   # runSimulation, through the cache
+        if(seed is None): return runSimulation(engine, population_size, virulence, avgDTI, avgIL, DC, seed=seed, maxLength=maxLength)
+        key = self.key(engine, population_size, virulence, avgDTI, avgIL, DC, seed, maxLength)
+        simData = self.get(key)
+        if(simData is not None):
+            self.hits += 1
+            return simData
+
+        with self.lock:
+            future = self.running.get(key)
+            making = future is None
+            if(making): future = self.running[key] = Future()
+        if(not making):   # another thread is making it
+            simData = future.result()
+            self.hits += 1
+            return simData
+
+        try:
+            simData = self.make(key, lambda: runSimulation(engine, population_size, virulence, avgDTI, avgIL, DC, seed=seed, maxLength=maxLength))
+            future.set_result(simData)
+            return simData
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock: del self.running[key]
+
+    def make(self, key, runner):   # runs it, unless another process already is, in which case waits for theirs
+        lockPath = self.path(key, ".lock")
+        os.makedirs(os.path.dirname(lockPath), exist_ok=True)
+        while(True):
+            try:
+                os.close(os.open(lockPath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                simData = self.get(key)
+                if(simData is not None):
+                    self.hits += 1
+                    return simData
+                try:
+                    if(time.time() - os.path.getmtime(lockPath) > self.lockTimeout): os.remove(lockPath)
+                except FileNotFoundError: pass
+                time.sleep(self.pollInterval)
+
+        done = threading.Event()
+        def heartbeat():   # keeps the lock fresh so a long run is not taken for a dead one
+            while(not done.wait(self.lockTimeout / 4)):
+                try: os.utime(lockPath)
+                except FileNotFoundError: return
+        threading.Thread(target=heartbeat, daemon=True).start()
+        try:
+            simData = self.get(key)   # finished between the first look and taking the lock
+            if(simData is not None):
+                self.hits += 1
+                return simData
+            self.misses += 1
+            simData = runner()
+            self.put(key, simData)
+            return simData
+        finally:
+            done.set()
+            try: os.remove(lockPath)
+            except FileNotFoundError: pass   # taken over as stale and already released
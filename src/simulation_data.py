@@ -1,32 +1,162 @@
-import matplotlib.pyplot as plt
-import pandas as pd
+from array import array
+import copy
+import json
+import struct
+import sys
 
 data = ["number_infected", "number_infectious", "number_immune", "number_alive", "number_dead", "number_susceptible", "day"]
 
+'''
+Saved file format (.dsim)
+
+magic b"DSIMDATA", format version (uint32), header length (uint32), then a json header
+padded with spaces to a multiple of 8 bytes, then every column in the header's order as
+totalDays little endian int64s. Columns can be memory mapped straight from the file.
+The header's totalDays is the number of days in the file, which start at firstDay (0 if
+it is missing).
+'''
+
+fileMagic = b"DSIMDATA"
+fileVersion = 1
+
+'''
+Each column in data is kept in its own int64 array, which doubles in size when it is full.
+
+getColumn and getDataXY give numpy views of the filled part of a column without copying it.
+A view keeps showing the old array once the columns have grown, so get a new one after
+adding more days.
+
+numpy, pandas and matplotlib are only imported by the methods that need them, so running
+a simulation and saving its data does not load them.
+
+A run that streams its days somewhere else (see sinks.py) can forget them as it goes, so
+only the last few are kept. Days still count from the start of the run, firstDay is the
+first one still kept and getColumn only has the kept days.
+'''
+
 class SimulationData():
-    def __init__(self, populationSize, randSeed):
+    def __init__(self, populationSize, randSeed, capacity=64):
         self.randSeed = randSeed
         self.popSize = populationSize
-        self.days = []
         self.totalDays = 0
+        self.firstDay = 0
+        self.columns = {name: array("q", bytes(8 * capacity)) for name in data}
+
+    def grow(self):
+        for name, column in self.columns.items():
+            grown = self.keptArray(name)
+            grown.frombytes(bytes(8 * (max(64, 2 * len(column)) - self.numKept)))
+            self.columns[name] = grown
+
+    def keptArray(self, name):   # a copy of the kept days of a column as an array("q")
+        kept = array("q")
+        kept.frombytes(memoryview(self.columns[name]).cast("B")[:8 * self.numKept])
+        return kept
 
     def addDayData(self, numInfected, numInfectious, numImmune, numAlive):
-        self.days.append({"day": self.totalDays, "number_infected": numInfected, "number_infectious": numInfectious, "number_immune": numImmune, "number_alive": numAlive, "number_dead": self.popSize - numAlive, "number_susceptible": max(0, numAlive - (numInfectious + numImmune))})
+        row = self.numKept
+        if(row == len(self.columns["day"])): self.grow()
+        values = (numInfected, numInfectious, numImmune, numAlive, self.popSize - numAlive, max(0, numAlive - (numInfectious + numImmune)), self.totalDays)
+        for name, value in zip(data, values):
+            self.columns[name][row] = value
         self.totalDays+=1
-    
+
+    @property
+    def numKept(self):
+        return self.totalDays - self.firstDay
+
+    def forget(self, keep=1):   # drop all but the last keep days
+        kept = min(keep, self.numKept)
+        columns = {}
+        for name in data:
+            columns[name] = self.keptArray(name)[self.numKept - kept:]
+            columns[name].frombytes(bytes(8 * (max(64, kept) - kept)))
+        self.columns = columns
+        self.firstDay = self.totalDays - kept
+
+    def copy(self):   # a SimulationData that can carry on separately from this one
+        simData = copy.copy(self)
+        simData.columns = {name: self.keptArray(name) for name in data}
+        return simData
+
+    def getColumn(self, name):
+        import numpy as np
+        return np.frombuffer(self.columns[name], dtype=np.int64, count=self.numKept)
+
+    def getDayData(self, day):
+        if(day < 0): day += self.totalDays
+        if(day < self.firstDay): raise IndexError(f"day {day} has been forgotten, only days from {self.firstDay} are kept")
+        return {name: int(self.columns[name][day - self.firstDay]) for name in data}
+
     def getDataXY(self, x_type, y_type):
-        return ([day[x_type] for day in self.days], [day[y_type] for day in self.days])
+        return (self.getColumn(x_type), self.getColumn(y_type))
+
+    @property
+    def days(self):   # one dict per day, like SimulationData used to store
+        order = ["day"] + data[:-1]
+        return [dict(zip(order, values)) for values in zip(*[self.keptArray(name).tolist() for name in order])]
 
     def visualizeData(self, x_type, y_type):
-        plt.scatter([day[x_type] for day in self.days], [day[y_type] for day in self.days])
+        import matplotlib.pyplot as plt
+        plt.scatter(self.getColumn(x_type), self.getColumn(y_type))
         plt.title(f"{x_type} by {y_type}")
         plt.xlabel(x_type)
         plt.ylabel(y_type)
         plt.show()
 
     def exportDataAsCSV(self, filename):
-        df = pd.DataFrame(self.days)
+        import pandas as pd
+        df = pd.DataFrame({name: self.getColumn(name) for name in ["day"] + data[:-1]})
         df.to_csv(filename, index=False)
-    
+
+    def save(self, filename):
+        header = json.dumps({"popSize": self.popSize, "randSeed": self.randSeed, "totalDays": self.numKept, "firstDay": self.firstDay, "columns": data, "dtype": "<i8"}).encode()
+        header += b" " * (-(len(fileMagic) + 8 + len(header)) % 8)
+        with open(filename, "wb") as file:
+            file.write(fileMagic + struct.pack("<II", fileVersion, len(header)) + header)
+            for name in data:
+                column = self.keptArray(name)
+                if(sys.byteorder != "little"): column.byteswap()
+                file.write(column)
+
+    @classmethod
+    def load(cls, filename, mmap=True):   # with mmap the columns are read from the file as they are used
+        import numpy as np
+        with open(filename, "rb") as file:
+            start = file.read(len(fileMagic) + 8)
+            if(start[:len(fileMagic)] != fileMagic):
+                raise ValueError(f"{filename} is not a simulation data file")
+            version, headerLength = struct.unpack("<II", start[len(fileMagic):])
+            if(version > fileVersion):
+                raise ValueError(f"{filename} was saved with a newer version of the simulator (format {version}, this version reads up to {fileVersion})")
+            header = json.loads(file.read(headerLength))
+
+        simData = cls(header["popSize"], header["randSeed"], capacity=0)
+        numDays = header["totalDays"]   # days in the file, from firstDay
+        simData.firstDay = simData.totalDays = header.get("firstDay", 0)
+        if(numDays == 0): return simData
+
+        offset = len(fileMagic) + 8 + headerLength
+        shape = (len(header["columns"]), numDays)
+        if(mmap): blocks = np.memmap(filename, dtype="<i8", mode="r", offset=offset, shape=shape)
+        else: blocks = np.fromfile(filename, dtype="<i8", count=shape[0] * shape[1], offset=offset).reshape(shape)
+        if(sys.byteorder != "little"): blocks = blocks.astype(np.int64)
+        simData.columns = dict(zip(header["columns"], blocks))
+        simData.totalDays += numDays
+        return simData
+
     def _printAllData(self):
         print(self.days)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["columns"] = {name: column[:self.numKept] for name, column in self.columns.items()}
+        return state
+
+    def __setstate__(self, state):
+        if("days" in state):   # pickled before columns existed, days is a list of dicts
+            days = state.pop("days")
+            state["columns"] = {name: array("q", [day[name] for day in days]) for name in data}
+            state["totalDays"] = len(days)
+        state.setdefault("firstDay", 0)
+        self.__dict__.update(state)
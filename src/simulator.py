@@ -1,56 +1,351 @@
+import copy
+import heapq
+import itertools
+import math
 import random
-from simulation_data import SimulationData
+from array import array
+from contextlib import closing, nullcontext
+from time import perf_counter
+from engines import DayLoop
+from profiling import PhaseProfile
+from simulation_data import SimulationData, data
+from snapshot import readSnapshot, writeSnapshot
 
-class Simulation:
-    def __init__(self, population_size, virulence, avgDTI, avgIL, DC, debug=False):
+transitions = ["infectious", "recover", "die"]
+
+class Simulation(DayLoop):
+    def __init__(self, population_size, virulence, avgDTI, avgIL, DC, debug=False, checkCounts=False, eventDriven=False, seed=None, profile=False, transmissionLog=False, contactRate=1):
         self.virulence = virulence
         self.avgDTI = avgDTI
         self.avgIL = avgIL
         self.DC = DC
+        self.contactRate = contactRate
         self.debug = debug
+        self.checkCounts = checkCounts
+        self.eventDriven = eventDriven
         self.popSize = population_size
-        self.population = [Person(virulence, avgDTI, avgIL, DC, infected=True)]
-        randSeed = random.randint(0, 10000000)
-        random.seed(randSeed)
+        randSeed = seed if seed is not None else random.randint(0, 10000000)
+        self.rng = random.Random(randSeed)
+        self.profile = PhaseProfile() if profile else None
+        if(profile): self.population = ProfiledPersonStore(population_size, virulence, avgDTI, avgIL, DC, rng=self.rng, contactRate=contactRate, profile=self.profile)
+        else: self.population = PersonStore(population_size, virulence, avgDTI, avgIL, DC, rng=self.rng, contactRate=contactRate)
+        self.population.state[0] = INFECTED
+        self.transmissionLog = None
+        if(transmissionLog):   # True to keep the log in memory, or a filename to write it to
+            from transmission_log import TransmissionLog
+            self.transmissionLog = TransmissionLog(population_size, filename=transmissionLog if isinstance(transmissionLog, str) else None)
+            self.transmissionLog.today = -1
+            self.transmissionLog.infection(-1, 0)
+            self.population.log = self.transmissionLog
         self.simData = SimulationData(population_size, randSeed)
         self.day = 0
 
-        for i in range(self.popSize-1):
-            self.population.append(Person(virulence, avgDTI, avgIL, DC))
+        self.alive = AliveIndex(self.population)
+        self.counts = CompartmentCounts.fromPopulation(self.population)
+        self.population.alive, self.population.counts = self.alive, self.counts
         self.sc = True
+
+        if(self.eventDriven):
+            self.events = []   # heap of (day, order, transition, person index, daysInfected)
+            self.eventOrder = itertools.count()
+            self.spreaders = {}   # indices of infectious people, a dict so they are visited in a reproducible order
+            for i, state in enumerate(self.population.state):
+                if(state & INFECTED): self.scheduleInfection(i, -1)
+
+    def phase(self, name):   # times a block into the profile, if there is one
+        return self.profile.phase(name) if self.profile is not None else nullcontext()
     
     def getStats(self):
-        numInfected = 0
-        numInfectious = 0
-        numAlive = 0
-        numImmune = 0
+        if(self.checkCounts):
+            recount = CompartmentCounts.fromPopulation(self.population)
+            if(recount != self.counts):
+                raise RuntimeError(f"Compartment counts {self.counts} do not match a recount of the population {recount} on day {self.day}")
+
+        numInfected = self.counts.exposed + self.counts.infectious
+        numInfectious = self.counts.infectious
+        numImmune = self.counts.recovered
+        numAlive = len(self.population) - self.counts.dead
         totalPpl = len(self.population)
-        for p in self.population:
-            if(p.infected): numInfected += 1
-            if(p.infectious): numInfectious += 1
-            if(p.immune): numImmune += 1
-            if(not p.dead): numAlive += 1
         if(numInfected == 0 or numAlive == 0): 
             self.sc = False
         return numInfected, numInfectious, numImmune, numAlive, totalPpl
 
+    def scheduleInfection(self, i, day, survived=0):   # queue everything that will happen to someone infected on this day, who has lived through survived days of it
+        people = self.population
+        deathChance = (people.dc / 4) * people.natural_immunity[i]
+        if(deathChance <= 0): daysTillDeath = math.inf
+        elif(deathChance >= 1): daysTillDeath = survived + 1
+        else: daysTillDeath = survived + int(math.log(1 - self.rng.random()) / math.log(1 - deathChance)) + 1
+
+        if(daysTillDeath > people.dti and not people.state[i] & INFECTIOUS):
+            self.scheduleEvent(day + people.dti, "infectious", i, people.dti)
+        if(daysTillDeath <= people.il + people.dti):
+            self.scheduleEvent(day + daysTillDeath, "die", i, daysTillDeath)
+        else:
+            self.scheduleEvent(day + people.il + people.dti, "recover", i, people.il + people.dti)
+
+    def redrawDeaths(self):   # event driven mode: after the death chance changes, draws again when everyone infected dies
+        infectedOn = {}
+        for day, order, transition, i, daysInfected in sorted(self.events):
+            infectedOn.setdefault(i, day - daysInfected)
+        self.events = []
+        for i, start in infectedOn.items():
+            self.scheduleInfection(i, start, survived=self.day - 1 - start)
+
+    def scheduleEvent(self, day, transition, i, daysInfected):
+        heapq.heappush(self.events, (day, next(self.eventOrder), transition, i, daysInfected))
+
+    def processEvents(self):
+        people = self.population
+        with self.phase("progression"):
+            while(self.events and self.events[0][0] <= self.day):
+                day, order, transition, i, daysInfected = heapq.heappop(self.events)
+                people.daysInfected[i] = daysInfected
+                if(transition == "infectious"):
+                    people.becomeInfectious(i, self.counts)
+                    self.spreaders[i] = None
+                elif(transition == "recover"):
+                    people.recover(i, self.counts)
+                    self.spreaders.pop(i, None)
+                elif(transition == "die"):
+                    people.die(i, self.alive, self.counts)
+                    self.spreaders.pop(i, None)
+
+        newlyInfected = []
+        for i in self.spreaders:
+            people.spread(i, self.alive, self.counts, newlyInfected, self.rng)
+        with self.phase("scheduling"):
+            for i in newlyInfected:
+                self.scheduleInfection(i, self.day)
+
     def dayTick(self):
-        for p in self.population:
-            p.dayTick(self.population)
+        if(self.transmissionLog is not None): self.transmissionLog.today = self.day
+        if(self.eventDriven):
+            self.processEvents()
+        else:
+            people = self.population
+            for i in range(len(people)):
+                people.dayTick(i, self.alive, self.counts, self.rng)
 
-        numInfected, numInfectious, numImmune, numAlive, totalPpl = self.getStats()
-        self.simData.addDayData(numInfected, numInfectious, numImmune, numAlive)
-        if(self.debug): print(f"----\nDay: {self.day}\nNumber Infected: {numInfected}\nNumber Infectious: {numInfectious}\nNumber Immune: {numImmune}\nNumber Alive: {numAlive}\nPopulation Size: {totalPpl}\n----")
+        with self.phase("stats"):
+            numInfected, numInfectious, numImmune, numAlive, totalPpl = self.getStats()
+        with self.phase("record"):
+            self.simData.addDayData(numInfected, numInfectious, numImmune, numAlive)
+        self.printDay(numInfected, numInfectious, numImmune, numAlive, totalPpl)
+        if(self.profile is not None): self.profile.endDay(self.day)
+        if(self.transmissionLog is not None and not self.sc): self.transmissionLog.flush()
         self.day+=1
     
-    def shouldContinue(self):
-        return self.sc
-
-    def run(self, maxLength=-1):
-        while(self.sc and self.day != maxLength):
-            self.dayTick()
+    def run(self, maxLength=-1, checkpoint=None, checkpointEvery=100):   # with checkpoint, the whole state is saved to that file every checkpointEvery days
+        with closing(self.tickDays(maxLength)) as days:
+            for day in days:
+                if(checkpoint is not None and day % checkpointEvery == 0): self.checkpoint(checkpoint)
         return self.simData
 
+    def finished(self):
+        if(self.transmissionLog is not None): self.transmissionLog.close()
+
+    def fork(self, virulence=None, contactRate=None, DC=None, seed=None):   # an independent copy of this simulation from today on, with the given changes
+        branch = copy.copy(self)
+        branch.population = self.population.fork()
+        branch.alive = AliveIndex.__new__(AliveIndex)
+        branch.alive.indices, branch.alive.slots = array("i", self.alive.indices), array("i", self.alive.slots)
+        branch.counts = CompartmentCounts(*self.counts.asTuple())
+        branch.population.alive, branch.population.counts = branch.alive, branch.counts
+        branch.simData = self.simData.copy()
+        branch.rng = random.Random(seed)
+        if(seed is None): branch.rng.setstate(self.rng.getstate())   # same draws as this simulation, so differences between forks come from their changes
+        if(self.eventDriven):
+            branch.events = list(self.events)
+            branch.spreaders = dict(self.spreaders)
+            order = next(self.eventOrder)
+            self.eventOrder, branch.eventOrder = itertools.count(order), itertools.count(order)
+        if(self.profile is not None):
+            branch.profile = branch.population.profile = PhaseProfile()
+        if(self.transmissionLog is not None):   # the fork's log is kept in memory and starts with everything logged so far
+            from transmission_log import TransmissionLog
+            branch.transmissionLog = branch.population.log = TransmissionLog(self.popSize, chunkSize=self.transmissionLog.chunkSize)
+            branch.transmissionLog.chunks = [self.transmissionLog.events()]
+            branch.transmissionLog.numFlushed = len(self.transmissionLog)
+            branch.transmissionLog.today = self.transmissionLog.today
+
+        if(virulence is not None): branch.virulence = branch.population.virulence = virulence
+        if(contactRate is not None): branch.contactRate = branch.population.contactRate = contactRate
+        if(DC is not None):
+            branch.DC = branch.population.dc = DC
+            if(branch.eventDriven): branch.redrawDeaths()
+        return branch
+
+    def checkpoint(self, path):   # saves everything restore needs to carry on exactly where this left off
+        people = self.population
+        simData = self.simData
+        header = {
+            "parameters": [self.popSize, self.virulence, self.avgDTI, self.avgIL, self.DC], "contactRate": self.contactRate,
+            "debug": self.debug, "checkCounts": self.checkCounts, "eventDriven": self.eventDriven,
+            "day": self.day, "sc": self.sc, "rng": self.rng.getstate(), "counts": self.counts.asTuple(),
+            "simData": {"popSize": simData.popSize, "randSeed": simData.randSeed, "totalDays": simData.totalDays, "firstDay": simData.firstDay},
+        }
+        blocks = {
+            "state": people.state, "daysInfected": people.daysInfected,
+            "natural_immunity": people.natural_immunity, "hygiene": people.hygiene, "sociability": people.sociability,
+            "alive.indices": self.alive.indices, "alive.slots": self.alive.slots,
+        }
+        for name in data:
+            column = array("q")
+            column.frombytes(memoryview(simData.columns[name]).cast("B")[:8 * simData.numKept])
+            blocks[f"simData.{name}"] = column
+
+        if(self.eventDriven):
+            order = next(self.eventOrder)
+            self.eventOrder = itertools.count(order)
+            header["eventOrder"] = order
+            blocks["events.day"] = array("q", (event[0] for event in self.events))
+            blocks["events.order"] = array("q", (event[1] for event in self.events))
+            blocks["events.transition"] = bytearray(transitions.index(event[2]) for event in self.events)
+            blocks["events.person"] = array("i", (event[3] for event in self.events))
+            blocks["events.daysInfected"] = array("i", (event[4] for event in self.events))
+            blocks["spreaders"] = array("i", self.spreaders)
+
+        log = self.transmissionLog
+        if(log is not None):
+            log.flush()
+            header["transmissionLog"] = {"filename": log.filename, "numFlushed": log.numFlushed, "chunkSize": log.chunkSize}
+            if(log.filename is None): blocks["transmissionLog"] = log.events()
+        writeSnapshot(path, header, blocks)
+
+    @classmethod
+    def restore(cls, path):   # a Simulation carrying on from a checkpoint, it takes the same random draws the original would have
+        header, blocks = readSnapshot(path)
+        sim = cls.__new__(cls)
+        sim.popSize, sim.virulence, sim.avgDTI, sim.avgIL, sim.DC = header["parameters"]
+        sim.contactRate = header.get("contactRate", 1)
+        sim.debug = header["debug"]
+        sim.checkCounts = header["checkCounts"]
+        sim.eventDriven = header["eventDriven"]
+        sim.day = header["day"]
+        sim.sc = header["sc"]
+        version, state, gauss = header["rng"]
+        sim.rng = random.Random()
+        sim.rng.setstate((version, tuple(state), gauss))
+        sim.profile = None   # profiling starts again from nothing
+
+        people = sim.population = PersonStore.__new__(PersonStore)
+        people.virulence, people.dti, people.il, people.dc, people.contactRate = sim.virulence, sim.avgDTI, sim.avgIL, sim.DC, sim.contactRate
+        people.state, people.daysInfected = blocks["state"], blocks["daysInfected"]
+        people.natural_immunity, people.hygiene, people.sociability = blocks["natural_immunity"], blocks["hygiene"], blocks["sociability"]
+        people.log = None
+        sim.alive = AliveIndex.__new__(AliveIndex)
+        sim.alive.indices, sim.alive.slots = blocks["alive.indices"], blocks["alive.slots"]
+        sim.counts = CompartmentCounts(*header["counts"])
+        people.alive, people.counts = sim.alive, sim.counts
+
+        info = header["simData"]
+        sim.simData = SimulationData(info["popSize"], info["randSeed"], capacity=0)
+        sim.simData.columns = {name: blocks[f"simData.{name}"] for name in data}
+        sim.simData.totalDays, sim.simData.firstDay = info["totalDays"], info["firstDay"]
+
+        if(sim.eventDriven):
+            sim.eventOrder = itertools.count(header["eventOrder"])
+            sim.events = [(day, order, transitions[transition], i, daysInfected) for day, order, transition, i, daysInfected in
+                          zip(blocks["events.day"], blocks["events.order"], blocks["events.transition"], blocks["events.person"], blocks["events.daysInfected"])]
+            sim.spreaders = dict.fromkeys(blocks["spreaders"])
+
+        sim.transmissionLog = None
+        if("transmissionLog" in header):
+            import numpy as np
+            from transmission_log import TransmissionLog, eventType, logMagic
+            info = header["transmissionLog"]
+            log = sim.transmissionLog = people.log = TransmissionLog(sim.popSize, chunkSize=info["chunkSize"])
+            log.today = sim.day
+            log.numFlushed = info["numFlushed"]
+            if(info["filename"] is None):
+                log.chunks = [np.frombuffer(blocks["transmissionLog"], dtype=eventType)]
+            else:   # drop anything logged after the checkpoint was taken
+                log.filename = info["filename"]
+                with open(log.filename, "r+b") as file: file.truncate(len(logMagic) + log.numFlushed * eventType.itemsize)
+        return sim
+
+'''
+Event driven mode
+
+Instead of visiting every person every day, the day each infected person will become
+infectious, recover or die is worked out when they are infected and put in a priority
+queue. Each day only the people with something due and the infectious people making
+contacts are visited. Dying is still a daily death chance, so the number of days till
+death is drawn from the matching geometric distribution.
+'''
+
+'''
+Living people, kept so a random living person can be picked in O(1)
+
+The indices of living people are stored in an array and slots holds where each person is
+in it (-1 once they are dead). When someone dies the last index in the array is moved
+into their slot.
+'''
+
+class AliveIndex:
+    def __init__(self, population):
+        self.indices = array("i", [i for i, state in enumerate(population.state) if not state & DEAD])
+        self.slots = array("i", [-1]) * len(population)
+        for slot, i in enumerate(self.indices):
+            self.slots[i] = slot
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, slot):
+        return self.indices[slot]
+
+    def remove(self, i):
+        slot = self.slots[i]
+        last = self.indices.pop()
+        if(last != i):
+            self.indices[slot] = last
+            self.slots[last] = slot
+        self.slots[i] = -1
+
+'''
+Number of people in each SEIRD state, updated by PersonStore as people change state
+
+susceptible: not infected yet
+exposed: infected, not infectious yet
+infectious: infected and infectious
+recovered: immune
+dead: dead
+'''
+
+class CompartmentCounts:
+    def __init__(self, susceptible=0, exposed=0, infectious=0, recovered=0, dead=0):
+        self.susceptible = susceptible
+        self.exposed = exposed
+        self.infectious = infectious
+        self.recovered = recovered
+        self.dead = dead
+
+    @classmethod
+    def fromPopulation(cls, population):
+        counts = cls()
+        for state in population.state:
+            if(state & DEAD): counts.dead += 1
+            elif(state & IMMUNE): counts.recovered += 1
+            elif(state & INFECTIOUS): counts.infectious += 1
+            elif(state & INFECTED): counts.exposed += 1
+            else: counts.susceptible += 1
+        return counts
+
+    def removeInfected(self, state):   # take an exposed or infectious person out of their state
+        if(state & INFECTIOUS): self.infectious -= 1
+        else: self.exposed -= 1
+
+    def asTuple(self):
+        return (self.susceptible, self.exposed, self.infectious, self.recovered, self.dead)
+
+    def __eq__(self, other):
+        return self.asTuple() == other.asTuple()
+
+    def __repr__(self):
+        return "CompartmentCounts(S={}, E={}, I={}, R={}, D={})".format(*self.asTuple())
+
 '''
 Factors which affect individual virus infection
 
@@ -63,53 +358,251 @@ After infection, two outcomes(depends on natural immunity)
 2. immune
 '''
 
-class Person:
-    def __init__(self, virulence, dti, il, dc, natural_immunity=random.random(), hygiene=random.random(), sociability=random.random(), infected=False):
+'''
+Everyone in a population packed into arrays, one entry per person
+
+state holds the flags below, daysInfected is a uint16 and the factors are float32s, about
+23 bytes a person with the alive index. The disease (virulence, dti, il, dc) is the same
+for everyone so it is only stored once, here. People are passed around by index, Person
+is a view of one index for code that wants an object.
+
+Person's dayTick and spread also take a sequence of Persons as the population, like they
+did before the store, which can mix people from different stores, such as ones made with
+Person(...). Then dead people are skipped rather than removed from it. Person's methods
+default to the owning Simulation's counts and alive index, so ticking a simulation's
+people one by one, with sim.population as the population, keeps its stats right.
+
+The disease parameters belong to the store, person.virulence = x raises, set
+sim.population.virulence (dti, il, dc) instead.
+'''
+
+INFECTED = 1
+INFECTIOUS = 2
+IMMUNE = 4
+DEAD = 8
+
+class PersonStore:
+    def __init__(self, size, virulence, dti, il, dc, rng=random, contactRate=1):
         self.virulence = virulence
         self.dti = dti
         self.il = il
         self.dc = dc
-        self.natural_immunity = natural_immunity
-        self.hygiene = hygiene
-        self.sociability = sociability
-        self.immune = False
-        self.dead = False
-        self.infected = infected
-        self.daysInfected = 0
-        self.infectious = False
+        self.contactRate = contactRate   # scales how many contacts infectious people make
+        self.state = bytearray(size)
+        self.daysInfected = array("H", bytes(2 * size))
+        self.natural_immunity = array("f", (rng.random() for i in range(size)))
+        self.hygiene = array("f", (rng.random() for i in range(size)))
+        self.sociability = array("f", (rng.random() for i in range(size)))
+        self.log = None   # a TransmissionLog, see transmission_log.py
+        self.alive = None   # the owning Simulation's AliveIndex and CompartmentCounts, kept up to date by Person's methods
+        self.counts = None
+
+    def __len__(self):
+        return len(self.state)
+
+    def fork(self):   # a copy with its own states, sharing the factor columns which never change during a run
+        store = copy.copy(self)
+        store.state = bytearray(self.state)
+        store.daysInfected = array("H", self.daysInfected)
+        return store
+
+    def __getitem__(self, i):
+        if(i < 0): i += len(self.state)
+        if(not 0 <= i < len(self.state)): raise IndexError("person index out of range")
+        return Person.view(self, i)
 
-    def dayTick(self, population):
-        if(self.dead): return
+    def dayTick(self, i, population, counts=None, rng=random):
+        state = self.state[i]
+        if(state & DEAD): return
 
-        if(self.infected):            # increment days infected if infected
-            self.daysInfected += 1
+        if(state & INFECTED):            # increment days infected if infected
+            days = self.daysInfected[i] + 1
+            self.daysInfected[i] = days
 
             # death chance
-            if(random.random() < (self.dc / 4) * self.natural_immunity):
-                self.dead = True
-                self.infectious = False
-                self.infected = False
-
-        if(self.daysInfected == self.dti): # decide if a person is infectious
-            self.infectious = True
-        
-        if(self.daysInfected == self.il + self.dti): 
-            self.immune = True
-            self.infectious = False
-            self.infected = False
-
-        if(self.infectious):                           # if infectious, try to infect others 
-            targets = [p for p in population if not p.dead]
-            for i in range(random.randint(3, 5) + round(self.sociability * 2)):
-                person = random.choice(targets)
-                if(person != self):
-                    person.infect()
-            
-
-    def infect(self):
-        if(self.immune): return
-
-        infectionChance = (self.virulence * ((1 - self.natural_immunity))) - (self.hygiene * 0.1)
-
-        if(random.random() < infectionChance):
-            self.infected = True
\ No newline at end of file
+            if(rng.random() < (self.dc / 4) * self.natural_immunity[i]):
+                self.die(i, population, counts)
+                return
+
+            if(days == self.dti): # decide if a person is infectious
+                self.becomeInfectious(i, counts)
+
+            if(days == self.il + self.dti):
+                self.recover(i, counts)
+
+        if(self.state[i] & INFECTIOUS):                           # if infectious, try to infect others 
+            self.spread(i, population, counts, rng=rng)
+
+    def die(self, i, population, counts=None):
+        if(counts is not None):
+            counts.removeInfected(self.state[i])
+            counts.dead += 1
+        self.state[i] = DEAD
+        if(population is not None): population.remove(i)
+        if(self.log is not None): self.log.death(i)
+
+    def becomeInfectious(self, i, counts=None):
+        if(counts is not None):
+            counts.exposed -= 1
+            counts.infectious += 1
+        self.state[i] |= INFECTIOUS
+
+    def recover(self, i, counts=None):
+        if(counts is not None):
+            counts.removeInfected(self.state[i])
+            counts.recovered += 1
+        self.state[i] = IMMUNE
+        if(self.log is not None): self.log.recovery(i)
+
+    def spread(self, i, population, counts=None, newlyInfected=None, rng=random):
+        for k in range(round((rng.randint(3, 5) + round(self.sociability[i] * 2)) * self.contactRate)):
+            j = rng.choice(population)
+            if(j != i and self.infect(j, counts, rng)):
+                if(newlyInfected is not None): newlyInfected.append(j)
+                if(self.log is not None): self.log.infection(i, j)
+
+    def infect(self, i, counts=None, rng=random):   # returns True if this person was not infected before
+        if(self.state[i] & (IMMUNE | DEAD)): return False
+
+        infectionChance = (self.virulence * ((1 - self.natural_immunity[i]))) - (self.hygiene[i] * 0.1)
+
+        if(rng.random() < infectionChance and not self.state[i] & INFECTED):
+            if(counts is not None):
+                counts.susceptible -= 1
+                counts.exposed += 1
+            self.state[i] |= INFECTED
+            return True
+        return False
+
+class ProfiledPersonStore(PersonStore):   # times progression, contacts and infection into a PhaseProfile, PersonStore itself is left without timers
+    def __init__(self, size, virulence, dti, il, dc, rng=random, contactRate=1, profile=None):
+        super().__init__(size, virulence, dti, il, dc, rng=rng, contactRate=contactRate)
+        self.profile = profile
+        self.spreading = 0.0
+
+    def dayTick(self, i, population, counts=None, rng=random):
+        start = perf_counter()
+        self.spreading = 0.0
+        super().dayTick(i, population, counts, rng)
+        self.profile.seconds["progression"] += perf_counter() - start - self.spreading
+        self.profile.calls["progression"] += 1
+
+    def spread(self, i, population, counts=None, newlyInfected=None, rng=random):   # PersonStore.spread with each contact and infection draw timed
+        profile = self.profile
+        began = start = perf_counter()
+        for k in range(round((rng.randint(3, 5) + round(self.sociability[i] * 2)) * self.contactRate)):
+            j = rng.choice(population)
+            picked = perf_counter()
+            profile.seconds["contacts"] += picked - start
+            profile.calls["contacts"] += 1
+            if(j != i):
+                profile.attempts += 1
+                if(self.infect(j, counts, rng)):
+                    profile.infections += 1
+                    if(newlyInfected is not None): newlyInfected.append(j)
+                    if(self.log is not None): self.log.infection(i, j)
+            start = perf_counter()
+            profile.seconds["infection"] += start - picked
+            profile.calls["infection"] += 1
+        self.spreading += perf_counter() - began
+
+def flagProperty(flag):
+    def get(self):
+        return bool(self.store.state[self.index] & flag)
+    def set(self, value):
+        if(value): self.store.state[self.index] |= flag
+        else: self.store.state[self.index] &= ~flag
+    return property(get, set)
+
+def columnProperty(name):
+    def get(self):
+        return getattr(self.store, name)[self.index]
+    def set(self, value):
+        getattr(self.store, name)[self.index] = value
+    return property(get, set)
+
+def diseaseProperty(name):   # the same for everyone, so it is set on the store
+    def set(self, value):
+        raise AttributeError(f"{name} is shared by everyone in the population, set it on the PersonStore (sim.population.{name}) instead")
+    return property(lambda self: getattr(self.store, name), set)
+
+def holdsPeople(population):   # a sequence of Persons (or a PersonStore) rather than indices
+    return isinstance(population, PersonStore) or isinstance(next(iter(population), None), Person)
+
+class Person:
+    __slots__ = ("store", "index")
+
+    def __init__(self, virulence, dti, il, dc, natural_immunity=None, hygiene=None, sociability=None, infected=False, rng=random):
+        self.store = PersonStore(1, virulence, dti, il, dc, rng=rng)   # someone made on their own gets a population of one
+        self.index = 0
+        if(natural_immunity is not None): self.natural_immunity = natural_immunity
+        if(hygiene is not None): self.hygiene = hygiene
+        if(sociability is not None): self.sociability = sociability
+        self.infected = infected
+
+    @classmethod
+    def view(cls, store, index):
+        person = cls.__new__(cls)
+        person.store = store
+        person.index = index
+        return person
+
+    virulence = diseaseProperty("virulence")
+    dti = diseaseProperty("dti")
+    il = diseaseProperty("il")
+    dc = diseaseProperty("dc")
+    natural_immunity = columnProperty("natural_immunity")
+    hygiene = columnProperty("hygiene")
+    sociability = columnProperty("sociability")
+    daysInfected = columnProperty("daysInfected")
+    infected = flagProperty(INFECTED)
+    infectious = flagProperty(INFECTIOUS)
+    immune = flagProperty(IMMUNE)
+    dead = flagProperty(DEAD)
+
+    def __eq__(self, other):
+        return isinstance(other, Person) and self.store is other.store and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+
+    def dayTick(self, population, counts=None, rng=random):
+        store, i = self.store, self.index
+        if(counts is None): counts = store.counts
+        if(not holdsPeople(population)): return store.dayTick(i, population, counts, rng)
+        if(store.state[i] & DEAD): return
+
+        if(store.state[i] & INFECTED):
+            days = store.daysInfected[i] + 1
+            store.daysInfected[i] = days
+            if(rng.random() < (store.dc / 4) * store.natural_immunity[i]):
+                store.die(i, store.alive, counts)
+                return
+            if(days == store.dti): store.becomeInfectious(i, counts)
+            if(days == store.il + store.dti): store.recover(i, counts)
+
+        if(store.state[i] & INFECTIOUS):
+            self.spread(population, counts, rng=rng)
+
+    def die(self, population, counts=None):
+        if(holdsPeople(population)): population = self.store.alive
+        self.store.die(self.index, population, counts if counts is not None else self.store.counts)
+
+    def becomeInfectious(self, counts=None):
+        self.store.becomeInfectious(self.index, counts if counts is not None else self.store.counts)
+
+    def recover(self, counts=None):
+        self.store.recover(self.index, counts if counts is not None else self.store.counts)
+
+    def spread(self, population, counts=None, newlyInfected=None, rng=random):
+        if(counts is None): counts = self.store.counts
+        if(not holdsPeople(population)): return self.store.spread(self.index, population, counts, newlyInfected, rng)
+        targets = [person for person in population if not person.dead]
+        for k in range(round((rng.randint(3, 5) + round(self.sociability * 2)) * self.store.contactRate)):
+            person = rng.choice(targets)
+            if(person != self and person.infect(counts if person.store is self.store else None, rng)):
+                if(newlyInfected is not None): newlyInfected.append(person)
+                if(self.store.log is not None and person.store is self.store): self.store.log.infection(self.index, person.index)
+
+    def infect(self, counts=None, rng=random):   # returns True if this person was not infected before
+        return self.store.infect(self.index, counts if counts is not None else self.store.counts, rng)
@@ -0,0 +1,125 @@
+import json
+import os
+import sys
+from array import array
+from simulation_data import SimulationData, data
+
+'''
+Places a running simulation's days can be written to as they are made
+
+Every engine has iterDays, which runs it one day at a time and yields each day's data (the
+dict getDayData gives). stream feeds those days to sinks, and with keepData=False the
+SimulationData forgets each day once the sinks have it, so a run of any length uses the
+same memory.
+
+CSVSink: writes a row per day to a csv file ("-" for stdout), flushed every day. The file
+    is started again unless append is set, then rows go after the ones already there
+ColumnarSink: a directory with one raw little endian int64 file per column, and a json
+    header saying how many days are complete, written every chunkSize days. load reads
+    it, while the run is still going too, as a SimulationData.
+CallbackSink: calls a function with every day
+'''
+
+class Sink:
+    def start(self, simData):   # called before the first day
+        pass
+
+    def write(self, day):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CSVSink(Sink):
+    def __init__(self, filename, append=False):
+        self.filename = filename
+        self.append = append
+        self.file = None
+        self.columns = ["day"] + data[:-1]
+
+    def start(self, simData):
+        self.file = sys.stdout if self.filename == "-" else open(self.filename, "a" if self.append else "w", newline="")
+        if(self.file is sys.stdout or self.file.tell() == 0):
+            self.file.write(",".join(self.columns) + "\n")
+
+    def write(self, day):
+        self.file.write(",".join(str(day[name]) for name in self.columns) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if(self.file is not None and self.file is not sys.stdout): self.file.close()
+
+class ColumnarSink(Sink):
+    def __init__(self, directory, chunkSize=1):
+        self.directory = directory
+        self.chunkSize = chunkSize
+        self.files = {}
+        self.chunk = {name: array("q") for name in data}
+
+    def start(self, simData):
+        os.makedirs(self.directory, exist_ok=True)
+        self.header = {"popSize": simData.popSize, "randSeed": simData.randSeed, "totalDays": 0, "firstDay": simData.totalDays, "columns": data, "dtype": "<i8"}
+        self.files = {name: open(os.path.join(self.directory, f"{name}.i8"), "wb") for name in data}
+        self.writeHeader()
+
+    def write(self, day):
+        for name in data:
+            self.chunk[name].append(day[name])
+        if(len(self.chunk["day"]) >= self.chunkSize): self.flush()
+
+    def flush(self):
+        numDays = len(self.chunk["day"])
+        if(numDays == 0): return
+        for name, file in self.files.items():
+            if(sys.byteorder != "little"): self.chunk[name].byteswap()
+            file.write(self.chunk[name].tobytes())
+            file.flush()
+            self.chunk[name] = array("q")
+        self.header["totalDays"] += numDays
+        self.writeHeader()
+
+    def writeHeader(self):   # replaced in one go, so readers only see days that are in every column file
+        path = os.path.join(self.directory, "header.json")
+        with open(path + ".tmp", "w") as file:
+            json.dump(self.header, file)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        self.flush()
+        for file in self.files.values(): file.close()
+        self.files = {}
+
+    @staticmethod
+    def load(directory):
+        import numpy as np
+        with open(os.path.join(directory, "header.json")) as file:
+            header = json.load(file)
+        simData = SimulationData(header["popSize"], header["randSeed"], capacity=0)
+        simData.firstDay = simData.totalDays = header["firstDay"]
+        numDays = header["totalDays"]
+        if(numDays == 0): return simData
+        simData.columns = {name: np.fromfile(os.path.join(directory, f"{name}.i8"), dtype="<i8", count=numDays).astype(np.int64) for name in header["columns"]}
+        simData.totalDays += numDays
+        return simData
+
+class CallbackSink(Sink):
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, day):
+        self.callback(day)
+
+def stream(simulation, sinks, maxLength=-1, keepData=False):   # runs a simulation into sinks, returns its SimulationData
+    for sink in sinks: sink.start(simulation.simData)
+    try:
+        for day in simulation.iterDays(maxLength, keepData):
+            for sink in sinks: sink.write(day)
+    finally:
+        for sink in sinks: sink.close()
+    return simulation.simData
@@ -0,0 +1,61 @@
+import json
+import os
+import struct
+import sys
+from array import array
+
+'''
+Binary snapshots: named arrays plus a json header, for Simulation.checkpoint
+
+magic b"DSIMSNAP", format version (uint32), header length (uint32), then a json header
+padded with spaces to a multiple of 8 bytes, then every block in the header's "blocks"
+list, each padded to a multiple of 8 bytes. A block is the raw bytes of an array.array
+(or anything else with the buffer protocol) in the byte order the header names.
+
+The snapshot is written to a temporary file next to path, synced to disk and then moved
+over path, so a crash while writing leaves the last snapshot as it was.
+'''
+
+snapshotMagic = b"DSIMSNAP"
+snapshotVersion = 1
+
+def writeSnapshot(path, header, blocks):   # blocks maps names to array.arrays
+    header = dict(header, byteorder=sys.byteorder, blocks=[])
+    for name, block in blocks.items():
+        view = memoryview(block).cast("B")
+        header["blocks"].append({"name": name, "typecode": block.typecode if isinstance(block, array) else "B", "bytes": len(view)})
+    encoded = json.dumps(header).encode()
+    encoded += b" " * (-(len(snapshotMagic) + 8 + len(encoded)) % 8)
+
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as file:
+        file.write(snapshotMagic + struct.pack("<II", snapshotVersion, len(encoded)) + encoded)
+        for block in blocks.values():
+            view = memoryview(block).cast("B")
+            file.write(view)
+            file.write(bytes(-len(view) % 8))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp, path)
+
+def readSnapshot(path):   # returns the header and a dict of name to array.array (bytearray for typecode "B")
+    with open(path, "rb") as file:
+        start = file.read(len(snapshotMagic) + 8)
+        if(start[:len(snapshotMagic)] != snapshotMagic):
+            raise ValueError(f"{path} is not a simulation snapshot")
+        version, headerLength = struct.unpack("<II", start[len(snapshotMagic):])
+        if(version > snapshotVersion):
+            raise ValueError(f"{path} was saved with a newer version of the simulator (snapshot format {version}, this version reads up to {snapshotVersion})")
+        header = json.loads(file.read(headerLength))
+        blocks = {}
+        for info in header["blocks"]:
+            raw = file.read(info["bytes"])
+            file.read(-info["bytes"] % 8)
+            if(info["typecode"] == "B"):
+                blocks[info["name"]] = bytearray(raw)
+                continue
+            block = array(info["typecode"])
+            block.frombytes(raw)
+            if(header["byteorder"] != sys.byteorder): block.byteswap()
+            blocks[info["name"]] = block
+    return header, blocks
@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+import pandas as pd
+from engines import engines, runSimulation
+
+parameters = ["population_size", "virulence", "avgDTI", "avgIL", "DC"]
+integerParameters = ["population_size", "avgDTI", "avgIL"]
+
+'''
+Runs a simulation for every combination of parameter values
+
+values maps each parameter in parameters to a list of values. Either every combination
+is run (a grid), or if samples is given, that many points are picked from the ranges
+spanned by the lists with a latin hypercube. Each cell is run replicates times.
+
+Finished cells are appended to a checkpoint file as they come in, one json line each,
+after a header line describing the sweep. Running the same sweep with the same checkpoint
+file skips the cells already in it, so an interrupted sweep can be resumed. A sweep without
+a seed takes the one in the checkpoint, so the same command resumes it.
+'''
+
+def summarize(simData):
+    infected = simData.getColumn("number_infected")
+    last = simData.totalDays - 1
+    peak = int(np.argmax(infected)) if simData.totalDays else 0
+    return {
+        "days": simData.totalDays,
+        "peak_infected": int(infected[peak]) if simData.totalDays else 0,
+        "peak_day": peak,
+        "final_dead": int(simData.getColumn("number_dead")[last]) if simData.totalDays else 0,
+        "final_immune": int(simData.getColumn("number_immune")[last]) if simData.totalDays else 0,
+        "final_susceptible": int(simData.getColumn("number_susceptible")[last]) if simData.totalDays else 0,
+    }
+
+def runCell(engine, cell, seed, maxLength):
+    return summarize(runSimulation(engine, *[cell[p] for p in parameters], seed=seed, maxLength=maxLength))
+
+class Sweep:
+    def __init__(self, values, engine="vector", samples=None, replicates=1, seed=None, maxLength=-1, workers=None):
+        missing = [p for p in parameters if p not in values]
+        if(missing): raise ValueError(f"No values given for {missing}")
+        if(engine not in engines): raise ValueError(f"Unknown engine {engine!r}, expected one of {engines}")
+        self.values = {p: list(values[p]) for p in parameters}
+        self.engine = engine
+        self.samples = samples
+        self.replicates = replicates
+        self.seed = seed   # None picks one in run, or takes the checkpoint's
+        self.maxLength = maxLength
+        self.workers = workers or os.cpu_count()
+
+    def cells(self):
+        if(self.samples is None):
+            combos = itertools.product(*[self.values[p] for p in parameters])
+            return [self.castCell(dict(zip(parameters, combo))) for combo in combos]
+
+        # latin hypercube: every parameter's range is split into samples strata and each stratum is used once
+        rng = np.random.default_rng(self.seed)
+        points = (np.array([rng.permutation(self.samples) for p in parameters]).T + rng.random((self.samples, len(parameters)))) / self.samples
+        cells = []
+        for point in points:
+            cell = {}
+            for p, u in zip(parameters, point):
+                low, high = min(self.values[p]), max(self.values[p])
+                cell[p] = low + u * (high - low)
+            cells.append(self.castCell(cell))
+        return cells
+
+    def castCell(self, cell):
+        for p in parameters:
+            cell[p] = int(round(cell[p])) if p in integerParameters else float(cell[p])
+        return cell
+
+    def header(self):
+        return {"engine": self.engine, "samples": self.samples, "replicates": self.replicates, "seed": self.seed, "maxLength": self.maxLength, "values": self.values}
+
+    def cellSeed(self, cellIndex, replicate):
+        return int(np.random.SeedSequence(self.seed, spawn_key=(cellIndex, replicate)).generate_state(1)[0])
+
+    def readCheckpoint(self, checkpoint):   # returns the finished (cell, replicate) pairs and if the last line was cut off
+        done = set()
+        if(not os.path.exists(checkpoint)): return done, False
+        with open(checkpoint) as file:
+            text = file.read()
+        lines = text.splitlines()
+        if(lines and json.loads(lines[0]) != self.header()):
+            raise ValueError(f"{checkpoint} is a checkpoint for a different sweep, resume with the same parameters and seed or use another file")
+        for line in lines[1:]:
+            try: row = json.loads(line)
+            except json.JSONDecodeError: continue   # last line of an interrupted write
+            done.add((row["cell"], row["replicate"]))
+        return done, text != "" and not text.endswith("\n")
+
+    def pickSeed(self, checkpoint):   # without a seed, resuming carries on with the checkpoint's
+        if(self.seed is not None): return
+        if(os.path.exists(checkpoint)):
+            with open(checkpoint) as file:
+                first = file.readline()
+            if(first.strip()):
+                self.seed = json.loads(first)["seed"]
+                return
+        self.seed = int(np.random.SeedSequence().generate_state(1)[0])
+
+    def run(self, checkpoint):
+        self.pickSeed(checkpoint)
+        done, cutOff = self.readCheckpoint(checkpoint)
+        cells = self.cells()
+        todo = [(i, r) for i in range(len(cells)) for r in range(self.replicates) if (i, r) not in done]
+
+        with open(checkpoint, "a") as file:
+            if(file.tell() == 0):
+                file.write(json.dumps(self.header()) + "\n")
+            elif(cutOff):
+                file.write("\n")
+
+            def record(future):
+                i, r = running.pop(future)
+                row = {"cell": i, "replicate": r, "seed": self.cellSeed(i, r), **cells[i], **future.result()}
+                file.write(json.dumps(row) + "\n")
+                file.flush()
+
+            with ProcessPoolExecutor(self.workers) as pool:
+                running = {}
+                for i, r in todo:
+                    if(len(running) >= self.workers * 2):
+                        for future in wait(running, return_when=FIRST_COMPLETED).done: record(future)
+                    running[pool.submit(runCell, self.engine, cells[i], self.cellSeed(i, r), self.maxLength)] = (i, r)
+                for future in wait(list(running)).done: record(future)
+
+        return loadResults(checkpoint)
+
+def loadResults(checkpoint):   # one row per cell and replicate, sorted by cell
+    rows = []
+    with open(checkpoint) as file:
+        for line in file.read().splitlines()[1:]:
+            try: rows.append(json.loads(line))
+            except json.JSONDecodeError: continue
+    df = pd.DataFrame(rows)
+    if(len(df)): df = df.sort_values(["cell", "replicate"]).drop_duplicates(["cell", "replicate"]).reset_index(drop=True)
+    return df
+
+def parseValues(s):   # "0.8", "0.2,0.5,0.8" or start:stop:count
+    if(":" in s):
+        start, stop, count = s.split(":")
+        return list(np.linspace(float(start), float(stop), int(count)))
+    return [float(v) for v in s.split(",")]
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a disease simulation for every combination of parameter values. Values are a number, a comma separated list or start:stop:count")
+    parser.add_argument("--population", default="1000")
+    parser.add_argument("--virulence", default="0.8")
+    parser.add_argument("--dti", default="3", help="avg days till infectious")
+    parser.add_argument("--il", default="20", help="avg infection length")
+    parser.add_argument("--dc", default="0.1", help="mortality")
+    parser.add_argument("--samples", type=int, default=None, help="latin hypercube sample this many points instead of running the full grid")
+    parser.add_argument("--replicates", type=int, default=1)
+    parser.add_argument("--engine", choices=engines, default="vector")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-days", type=int, default=-1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default="sweep.jsonl", help="completed cells are kept here, rerun with the same file to resume")
+    parser.add_argument("--out", default="sweep.csv")
+    args = parser.parse_args()
+
+    values = {"population_size": parseValues(args.population), "virulence": parseValues(args.virulence), "avgDTI": parseValues(args.dti), "avgIL": parseValues(args.il), "DC": parseValues(args.dc)}
+    sweep = Sweep(values, engine=args.engine, samples=args.samples, replicates=args.replicates, seed=args.seed, maxLength=args.max_days, workers=args.workers)
+    sweep.pickSeed(args.checkpoint)
+    print(f"Sweep seed {sweep.seed}, checkpointing to {args.checkpoint}")
+    results = sweep.run(args.checkpoint)
+    results.to_csv(args.out, index=False)
+    print(f"{len(results)} runs saved to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+from array import array
+import numpy as np
+
+INFECTION = 0
+RECOVERY = 1
+DEATH = 2
+
+eventType = np.dtype([("day", "<i4"), ("kind", "i1"), ("infector", "<i4"), ("person", "<i4")])   # 13 bytes an event
+logMagic = b"DSIMLOG1"
+
+'''
+Who infected whom and when, and when people recovered or died, for Simulation(transmissionLog=...)
+
+Events go into preallocated columns of chunkSize events. When a chunk is full it is packed
+into eventType records and either kept in memory or, given a filename, appended to the file
+(logMagic then the records), so a long run costs 13 bytes an event. Simulation.run and
+iterDays close the log when they stop, writing out the last, part full chunk. events() gives every
+event so far as one numpy record array. infector is -1 for patient zero, who is infected
+on day -1, and for recoveries and deaths.
+
+People infected near the end of a run have not finished infecting others, so the last
+avgDTI + avgIL days of reproductionNumbers are too low unless the epidemic ran to its end.
+'''
+
+class TransmissionLog:
+    def __init__(self, populationSize, filename=None, chunkSize=1 << 16):
+        self.popSize = populationSize
+        self.filename = filename
+        self.chunkSize = chunkSize
+        self.today = 0   # set by the simulation each day
+        self.chunks = []
+        self.numFlushed = 0
+        self.filled = 0
+        self.days = array("i", bytes(4 * chunkSize))
+        self.kinds = bytearray(chunkSize)
+        self.infectors = array("i", bytes(4 * chunkSize))
+        self.people = array("i", bytes(4 * chunkSize))
+        if(filename is not None):
+            with open(filename, "wb") as file: file.write(logMagic)
+
+    def add(self, kind, infector, person):
+        n = self.filled
+        self.days[n] = self.today
+        self.kinds[n] = kind
+        self.infectors[n] = infector
+        self.people[n] = person
+        self.filled = n + 1
+        if(self.filled == self.chunkSize): self.flush()
+
+    def infection(self, infector, infectee):
+        self.add(INFECTION, infector, infectee)
+
+    def recovery(self, i):
+        self.add(RECOVERY, -1, i)
+
+    def death(self, i):
+        self.add(DEATH, -1, i)
+
+    def pending(self):   # the events not flushed yet, as records
+        n = self.filled
+        records = np.empty(n, dtype=eventType)
+        records["day"] = np.frombuffer(self.days, dtype=np.int32, count=n)
+        records["kind"] = np.frombuffer(self.kinds, dtype=np.int8, count=n)
+        records["infector"] = np.frombuffer(self.infectors, dtype=np.int32, count=n)
+        records["person"] = np.frombuffer(self.people, dtype=np.int32, count=n)
+        return records
+
+    def flush(self):
+        if(self.filled == 0): return
+        records = self.pending()
+        if(self.filename is None):
+            self.chunks.append(records)
+        else:
+            with open(self.filename, "ab") as file: file.write(records.tobytes())
+        self.numFlushed += self.filled
+        self.filled = 0
+
+    def close(self):   # writes out what is still pending, logging can carry on after it
+        self.flush()
+
+    def __len__(self):
+        return self.numFlushed + self.filled
+
+    def events(self):
+        if(self.filename is None): flushed = self.chunks
+        else: flushed = [np.fromfile(self.filename, dtype=eventType, count=self.numFlushed, offset=len(logMagic))]
+        return np.concatenate(flushed + [self.pending()])
+
+    @staticmethod
+    def load(filename, mmap=True):   # the events in a log file
+        with open(filename, "rb") as file:
+            if(file.read(len(logMagic)) != logMagic): raise ValueError(f"{filename} is not a transmission log")
+        if(mmap): return np.memmap(filename, dtype=eventType, mode="r", offset=len(logMagic))
+        return np.fromfile(filename, dtype=eventType, offset=len(logMagic))
+
+'''
+Analysis of a log's events, they take the record array from events() or load
+'''
+
+def infections(events):
+    return events[events["kind"] == INFECTION]
+
+def infectionDays(events, populationSize):   # the day each person was infected, -2 if they never were
+    infected = infections(events)
+    days = np.full(populationSize, -2, dtype=np.int32)
+    days[infected["person"]] = infected["day"]
+    return days
+
+def offspring(events, populationSize):   # how many people each infected person infected, in the order they were infected
+    infected = infections(events)
+    caused = np.bincount(infected["infector"][infected["infector"] >= 0], minlength=populationSize)
+    return caused[infected["person"]]
+
+def offspringDistribution(events, populationSize):   # number of infected people who infected 0, 1, 2... others
+    return np.bincount(offspring(events, populationSize))
+
+def reproductionNumbers(events, populationSize):   # (days, mean offspring of the people infected on each day)
+    infected = infections(events)
+    caused = offspring(events, populationSize)
+    days, position = np.unique(infected["day"], return_inverse=True)
+    return days, np.bincount(position, weights=caused) / np.bincount(position)
+
+def generationIntervals(events, populationSize):   # days between an infector and the person they infected getting infected
+    infected = infections(events)
+    infected = infected[infected["infector"] >= 0]
+    return infected["day"] - infectionDays(events, populationSize)[infected["infector"]]
@@ -0,0 +1,117 @@
+import random
+import numpy as np
+from engines import DayLoop
+from simulation_data import SimulationData
+
+'''
+Vectorized version of Simulation
+
+The population is stored as one numpy column per attribute of Person instead of
+one object per person, and a whole day is updated with batched random draws.
+
+Differences from Simulation
+1. every person gets their own natural_immunity, hygiene and sociability
+2. all infectious people make their contacts at the same time, so someone infected
+   today starts counting days infected tomorrow
+
+With a ContactNetwork (see network.py) people still make the same number of contacts a
+day, but they are picked from their neighbours instead of from everyone alive. Contacts
+with dead neighbours are wasted.
+'''
+
+class VectorSimulation(DayLoop):
+    def __init__(self, population_size, virulence, avgDTI, avgIL, DC, debug=False, seed=None, network=None):
+        self.virulence = virulence
+        self.avgDTI = avgDTI
+        self.avgIL = avgIL
+        self.DC = DC
+        self.debug = debug
+        self.popSize = population_size
+        if(network is not None and network.size != population_size):
+            raise ValueError(f"The contact network has {network.size} people but the population size is {population_size}")
+        self.network = network
+        randSeed = seed if seed is not None else random.randint(0, 10000000)
+        self.rng = np.random.default_rng(randSeed)
+        self.simData = SimulationData(population_size, randSeed)
+        self.day = 0
+
+        self.natural_immunity = self.rng.random(population_size)
+        self.hygiene = self.rng.random(population_size)
+        self.sociability = self.rng.random(population_size)
+        self.immune = np.zeros(population_size, dtype=bool)
+        self.dead = np.zeros(population_size, dtype=bool)
+        self.infected = np.zeros(population_size, dtype=bool)
+        self.infectious = np.zeros(population_size, dtype=bool)
+        self.daysInfected = np.zeros(population_size, dtype=np.int32)
+        self.infected[0] = True
+        self.sc = True
+
+    def getStats(self):
+        numInfected = int(np.count_nonzero(self.infected))
+        numInfectious = int(np.count_nonzero(self.infectious))
+        numImmune = int(np.count_nonzero(self.immune))
+        numAlive = self.popSize - int(np.count_nonzero(self.dead))
+        if(numInfected == 0 or numAlive == 0):
+            self.sc = False
+        return numInfected, numInfectious, numImmune, numAlive, self.popSize
+
+    def progress(self):
+        sick = np.flatnonzero(self.infected)
+        self.daysInfected[sick] += 1
+
+        # death chance
+        dies = self.rng.random(sick.size) < (self.DC / 4) * self.natural_immunity[sick]
+        died = sick[dies]
+        self.dead[died] = True
+        self.infected[died] = False
+        self.infectious[died] = False
+
+        sick = sick[~dies]
+        days = self.daysInfected[sick]
+        self.infectious[sick[days == self.avgDTI]] = True
+
+        recovered = sick[days == self.avgIL + self.avgDTI]
+        self.immune[recovered] = True
+        self.infectious[recovered] = False
+        self.infected[recovered] = False
+
+    def spread(self, away=0):   # away infectious people are somewhere else today and make no contacts here
+        spreaders = np.flatnonzero(self.infectious)
+        if(away > 0): spreaders = np.sort(self.rng.choice(spreaders, max(0, spreaders.size - away), replace=False))
+        if(spreaders.size == 0): return
+
+        numContacts = self.rng.integers(3, 6, spreaders.size) + np.rint(self.sociability[spreaders] * 2).astype(np.int64)
+        sources = np.repeat(spreaders, numContacts)
+        if(self.network is None):
+            targets = np.flatnonzero(~self.dead)
+            contacts = targets[self.rng.integers(0, targets.size, sources.size)]
+        else:   # a random neighbour from each source's slice of the network
+            start = self.network.indptr[sources]
+            degree = self.network.indptr[sources + 1] - start
+            sources, start, degree = sources[degree > 0], start[degree > 0], degree[degree > 0]
+            contacts = self.network.indices[start + (self.rng.random(sources.size) * degree).astype(np.int64)]
+            living = ~self.dead[contacts]
+            contacts, sources = contacts[living], sources[living]
+        self.infect(contacts[contacts != sources])
+
+    def visit(self, numVisitors):   # infectious people from somewhere else make their contacts here
+        if(numVisitors == 0): return
+        numContacts = self.rng.integers(3, 6, numVisitors) + np.rint(self.rng.random(numVisitors) * 2).astype(np.int64)
+        targets = np.flatnonzero(~self.dead)
+        if(targets.size == 0): return
+        self.infect(targets[self.rng.integers(0, targets.size, numContacts.sum())])
+
+    def infect(self, contacts):
+        contacts = contacts[~self.immune[contacts]]
+        infectionChance = (self.virulence * (1 - self.natural_immunity[contacts])) - (self.hygiene[contacts] * 0.1)
+        self.infected[contacts[self.rng.random(contacts.size) < infectionChance]] = True
+
+    def dayTick(self, visitors=0, away=0):
+        self.progress()
+        self.spread(away)
+        self.visit(visitors)
+
+        numInfected, numInfectious, numImmune, numAlive, totalPpl = self.getStats()
+        self.simData.addDayData(numInfected, numInfectious, numImmune, numAlive)
+        self.printDay(numInfected, numInfectious, numImmune, numAlive, totalPpl)
+        self.day+=1
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from calibration import Calibration, Generation, Posterior
+
+def test_quantiles_of_weights_summing_just_under_one():
+    posterior = Posterior(["virulence"])
+    generation = Generation(1.0)
+    generation.points = np.arange(8.0)[:, None]
+    generation.weights = np.full(8, 0.1249999999999999)
+    generation.distances = np.zeros(8)
+    posterior.generations.append(generation)
+    assert posterior.getQuantiles(1.0) == {"virulence": 7.0}
+    assert posterior.getQuantiles(0.0) == {"virulence": 0.0}
+
+def test_integer_prior_without_a_whole_number_is_refused():
+    with pytest.raises(ValueError, match="avgDTI"):
+        Calibration({"number_infected": np.arange(10)}, {"avgDTI": (2.6, 2.9)}, 100)
+
+def test_calibration_is_the_same_for_any_number_of_workers():
+    observed = {"number_infected": [1, 2, 4, 9, 15, 30, 50, 80, 120, 160]}
+    results = []
+    for workers in (1, 2):
+        calibration = Calibration(observed, {"virulence": (0.2, 1.0), "avgIL": (5, 30)}, 500, seed=3, workers=workers)
+        posterior = calibration.run(particles=10, generations=2)
+        results.append((posterior.last.points.tolist(), posterior.last.weights.tolist()))
+    assert results[0] == results[1]
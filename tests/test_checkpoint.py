@@ -0,0 +1,46 @@
+import pytest
+from simulation_data import data
+from simulator import Simulation
+from transmission_log import TransmissionLog
+
+def columns(simData):
+    return {name: list(simData.getColumn(name)) for name in data}
+
+def finalState(sim):
+    return bytes(sim.population.state), list(sim.population.daysInfected), sim.counts.asTuple(), sim.rng.getstate()
+
+@pytest.mark.parametrize("eventDriven", [False, True])
+@pytest.mark.parametrize("log", [False, True])
+def test_restore_carries_on_bit_identical(tmp_path, eventDriven, log):
+    sim = Simulation(2000, 0.8, 3, 20, 0.1, seed=4, eventDriven=eventDriven, transmissionLog=log)
+    sim.run(15)
+    sim.checkpoint(tmp_path / "sim.snap")
+    sim.run()
+
+    restored = Simulation.restore(tmp_path / "sim.snap")
+    assert restored.day == 15
+    restored.run()
+    assert columns(restored.simData) == columns(sim.simData)
+    assert finalState(restored) == finalState(sim)
+    if(log): assert restored.transmissionLog.events().tolist() == sim.transmissionLog.events().tolist()
+
+def test_restore_truncates_a_file_log_to_the_checkpoint(tmp_path):
+    sim = Simulation(2000, 0.8, 3, 20, 0.1, seed=4, transmissionLog=str(tmp_path / "sim.log"))
+    sim.run(15)
+    sim.checkpoint(tmp_path / "sim.snap")
+    sim.run()
+    logged = TransmissionLog.load(str(tmp_path / "sim.log"), mmap=False).tolist()
+
+    restored = Simulation.restore(tmp_path / "sim.snap")
+    restored.run()
+    assert TransmissionLog.load(str(tmp_path / "sim.log"), mmap=False).tolist() == logged
+
+def test_run_checkpoints_every_so_many_days(tmp_path):
+    sim = Simulation(2000, 0.8, 3, 20, 0.1, seed=4)
+    sim.run(25, checkpoint=tmp_path / "sim.snap", checkpointEvery=10)
+    assert Simulation.restore(tmp_path / "sim.snap").day == 20
+
+def test_restore_refuses_other_files(tmp_path):
+    (tmp_path / "other.snap").write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError, match="not a simulation snapshot"):
+        Simulation.restore(tmp_path / "other.snap")
@@ -0,0 +1,11 @@
+import pytest
+from simulator import CompartmentCounts, Simulation
+
+@pytest.mark.parametrize("eventDriven", [False, True])
+def test_counts_match_a_recount(eventDriven):
+    sim = Simulation(3000, 0.8, 3, 20, 0.2, seed=2, eventDriven=eventDriven, checkCounts=True)   # raises on any day they differ
+    simData = sim.run()
+    assert sim.counts == CompartmentCounts.fromPopulation(sim.population)
+    last = simData.getDayData(-1)
+    assert last["number_dead"] == sim.counts.dead
+    assert last["number_immune"] == sim.counts.recovered
@@ -0,0 +1,31 @@
+import math
+import numpy as np
+from engines import runSimulation
+from ensemble import Ensemble, metrics
+
+def bruteForce(population, seed, replicates):   # every replicate's counts, held at their last day once they end
+    seeds = Ensemble(population, 0.8, 3, 20, 0.1, seed=seed, workers=1).seeds(replicates)
+    runs = [runSimulation("vector", population, 0.8, 3, 20, 0.1, seed=s) for s in seeds]
+    numDays = max(run.totalDays for run in runs)
+    return np.array([[[run.getColumn(m)[min(day, run.totalDays - 1)] for m in metrics] for day in range(numDays)] for run in runs])
+
+def test_means_and_quantiles_match_a_brute_force_run():
+    ensembleData = Ensemble(500, 0.8, 3, 20, 0.1, seed=1, workers=1).run(15, quantiles=(0.25, 0.5, 0.9))
+    values = bruteForce(500, 1, 15)
+    assert ensembleData.totalDays == values.shape[1]
+    assert np.allclose(ensembleData.getMeans(), values.mean(axis=0))
+    for q in (0.25, 0.5, 0.9):   # the smallest count at least q of the replicates are at or under
+        assert (ensembleData.getQuantiles(q) == np.sort(values, axis=0)[math.ceil(q * 15) - 1]).all()
+
+def test_binned_quantiles_are_within_a_bin():
+    ensembleData = Ensemble(3000, 0.8, 3, 20, 0.1, seed=2, workers=1).run(8)
+    assert ensembleData.binWidth > 1
+    values = bruteForce(3000, 2, 8)
+    exact = np.sort(values, axis=0)[math.ceil(0.5 * 8) - 1]
+    assert (np.abs(ensembleData.getQuantiles(0.5) - exact) < ensembleData.binWidth).all()
+
+def test_pool_gives_the_same_ensemble():
+    alone = Ensemble(500, 0.8, 3, 20, 0.1, seed=3, workers=1).run(8)
+    pooled = Ensemble(500, 0.8, 3, 20, 0.1, seed=3, workers=2).run(8)
+    assert np.array_equal(alone.getMeans(), pooled.getMeans())
+    assert np.array_equal(alone.histograms(), pooled.histograms())
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from simulator import Simulation
+
+def outbreaks(eventDriven, seeds=range(6), size=2000):   # (fatality, attack rate) of the runs that took off
+    results = []
+    for seed in seeds:
+        last = Simulation(size, 0.8, 3, 20, 0.2, seed=seed, eventDriven=eventDriven).run().getDayData(-1)
+        ended = last["number_dead"] + last["number_immune"]
+        if(ended > size // 10): results.append((last["number_dead"] / ended, 1 - last["number_susceptible"] / size))
+    return np.array(results)
+
+def test_event_driven_matches_tick_mode():
+    ticked, evented = outbreaks(False), outbreaks(True)
+    assert len(ticked) >= 3 and len(evented) >= 3
+    fatality, attack = np.abs(ticked.mean(axis=0) - evented.mean(axis=0))
+    assert fatality < 0.03   # the geometric days till death give the same chance of dying as a daily draw
+    assert attack < 0.05
+
+def test_event_driven_is_reproducible():
+    first = Simulation(1000, 0.8, 3, 20, 0.1, seed=9, eventDriven=True).run()
+    second = Simulation(1000, 0.8, 3, 20, 0.1, seed=9, eventDriven=True).run()
+    assert [first.getDayData(d) for d in range(first.totalDays)] == [second.getDayData(d) for d in range(second.totalDays)]
+
+@pytest.mark.parametrize("eventDriven", [False, True])
+def test_patient_zero_becomes_infectious_on_the_same_day(eventDriven):
+    sim = Simulation(1000, 0.8, 4, 20, 0.0, seed=1, eventDriven=eventDriven)
+    assert [day["number_infectious"] for day in sim.iterDays(4)] == [0, 0, 0, 1]
@@ -0,0 +1,45 @@
+import pytest
+from simulation_data import data
+from simulator import Simulation
+
+def columns(simData):
+    return {name: list(simData.getColumn(name)) for name in data}
+
+def finalState(sim):
+    return bytes(sim.population.state), list(sim.population.daysInfected), sim.counts.asTuple(), sim.rng.getstate()
+
+@pytest.mark.parametrize("eventDriven", [False, True])
+def test_unchanged_fork_matches_its_parent(eventDriven):
+    sim = Simulation(2000, 0.8, 3, 20, 0.1, seed=7, eventDriven=eventDriven, transmissionLog=True)
+    sim.run(10)
+    branch = sim.fork()
+    branch.run()   # first, so any state shared with the parent would show up in the parent's run
+    sim.run()
+    assert columns(branch.simData) == columns(sim.simData)
+    assert finalState(branch) == finalState(sim)
+    assert branch.transmissionLog.events().tolist() == sim.transmissionLog.events().tolist()
+
+def test_fork_with_changes_leaves_the_parent_alone():
+    sim = Simulation(2000, 0.8, 3, 20, 0.1, seed=7)
+    sim.run(10)
+    reference = Simulation(2000, 0.8, 3, 20, 0.1, seed=7)
+    reference.run(10)
+
+    sim.fork(virulence=0.2, DC=0.5, seed=1).run()
+    sim.run()
+    reference.run()
+    assert columns(sim.simData) == columns(reference.simData)
+
+def test_forks_with_different_seeds_diverge():
+    sim = Simulation(2000, 0.8, 3, 20, 0.1, seed=7)
+    sim.run(10)
+    first, second = sim.fork(seed=1), sim.fork(seed=2)
+    assert first.simData.totalDays == second.simData.totalDays == 10
+    assert columns(first.run()) != columns(second.run())
+
+@pytest.mark.parametrize("eventDriven", [False, True])
+def test_deadlier_fork_kills_more(eventDriven):
+    sim = Simulation(3000, 0.8, 3, 20, 0.05, seed=3, eventDriven=eventDriven, checkCounts=True)
+    sim.run(12)
+    deadlier = sim.fork(DC=0.6)
+    assert deadlier.run().getDayData(-1)["number_dead"] > sim.run().getDayData(-1)["number_dead"]
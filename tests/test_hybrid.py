@@ -0,0 +1,35 @@
+import numpy as np
+from hybrid_simulator import HybridSimulation
+
+def agentCounts(sim):   # the agents counted into the compartment classes, as aggregate does
+    agents, compartments = sim.agents, sim.compartments
+    count = lambda mask: np.bincount(sim.classes[mask], minlength=sim.numClasses)
+    sick = np.flatnonzero(agents.infected)
+    ages = np.bincount(sim.classes[sick] * compartments.ages.shape[1] + agents.daysInfected[sick], minlength=compartments.ages.size)
+    return count(~(agents.infected | agents.immune | agents.dead)), count(agents.immune), count(agents.dead), ages.reshape(compartments.ages.shape)
+
+def test_counts_match_the_compartments_after_disaggregate():
+    sim = HybridSimulation(20000, 0.8, 3, 20, 0.1, seed=0, aggregateAt=200)
+    while(sim.sc and [to for day, to in sim.switches] != ["compartments", "agents"]):
+        sim.dayTick()
+    assert sim.engine is sim.agents
+    compartments = sim.compartments
+    susceptible, recovered, dead, ages = agentCounts(sim)
+    assert (susceptible == compartments.susceptible).all()
+    assert (recovered == compartments.recovered).all()
+    assert (dead == compartments.dead).all()
+    assert (ages == compartments.ages).all()
+    assert (sim.agents.infectious == (sim.agents.infected & (sim.agents.daysInfected >= sim.agents.avgDTI))).all()
+
+def test_nobody_becomes_susceptible_again():
+    sim = HybridSimulation(20000, 0.8, 3, 20, 0.1, seed=1, aggregateAt=200)
+    while(sim.engine is sim.agents): sim.dayTick()
+    before = ~(sim.agents.infected | sim.agents.immune | sim.agents.dead)
+    while(sim.engine is sim.compartments): sim.dayTick()
+    after = ~(sim.agents.infected | sim.agents.immune | sim.agents.dead)
+    assert not (after & ~before).any()
+
+def test_run_is_reproducible():
+    first = HybridSimulation(20000, 0.8, 3, 20, 0.1, seed=2, aggregateAt=200).run()
+    second = HybridSimulation(20000, 0.8, 3, 20, 0.1, seed=2, aggregateAt=200).run()
+    assert [first.getDayData(d) for d in range(first.totalDays)] == [second.getDayData(d) for d in range(second.totalDays)]
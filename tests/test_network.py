@@ -0,0 +1,23 @@
+import numpy as np
+from network import ContactNetwork
+
+def test_from_edges_drops_duplicates_and_self_loops():
+    u = [0, 1, 0, 2, 3, 3, 4]
+    v = [1, 0, 1, 2, 4, 3, 3]   # 0-1 three times, a self-loop on 2 and 3, and 3-4 both ways
+    network = ContactNetwork.fromEdges(5, u, v)
+    assert network.numEdges() == 2
+    assert network.degrees().tolist() == [1, 1, 0, 1, 1]
+    assert network.neighbours(0).tolist() == [1]
+    assert network.neighbours(3).tolist() == [4]
+    assert network.neighbours(2).tolist() == []
+
+def test_from_edges_is_symmetric_and_sorted():
+    rng = np.random.default_rng(1)
+    u, v = rng.integers(0, 50, 400), rng.integers(0, 50, 400)
+    network = ContactNetwork.fromEdges(50, u, v)
+    pairs = {(a, b) for a, b in zip(u.tolist(), v.tolist()) if a != b}
+    expected = pairs | {(b, a) for a, b in pairs}
+    got = {(i, int(j)) for i in range(50) for j in network.neighbours(i)}
+    assert got == expected
+    assert network.numEdges() == len(expected) // 2
+    assert all((np.diff(network.neighbours(i)) > 0).all() for i in range(50))
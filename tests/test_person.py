@@ -0,0 +1,43 @@
+import pytest
+from simulator import CompartmentCounts, Person, Simulation
+
+def test_person_methods_take_a_sequence_of_persons():
+    sim = Simulation(300, 0.8, 3, 20, 0.1, seed=1, checkCounts=True)
+    for day in range(15):
+        for person in list(sim.population): person.dayTick(sim.population)
+    assert sum(person.infected or person.immune or person.dead for person in sim.population) > 1
+    assert sim.counts == CompartmentCounts.fromPopulation(sim.population)
+    assert sorted(sim.alive.indices) == [person.index for person in sim.population if not person.dead]
+    sim.run()   # carries on with checkCounts, which raises if ticking people by hand broke the counts
+
+    people = [Person(0.9, 2, 5, 0.1, natural_immunity=0.1, hygiene=0.1) for i in range(20)]
+    people[0].infected = True
+    for day in range(10):
+        for person in people: person.dayTick(people)
+    assert sum(person.infected or person.immune or person.dead for person in people) > 1
+
+def test_dead_people_can_not_be_infected():
+    sim = Simulation(10, 1.0, 3, 20, 0.1, seed=1)
+    sim.population[0].die(sim.population)   # patient zero, people only die while infected
+    assert not sim.population[0].infect(rng=type("Always", (), {"random": lambda self: 0.0})())
+    assert sim.counts == CompartmentCounts.fromPopulation(sim.population)
+
+def test_disease_parameters_are_set_on_the_store():
+    sim = Simulation(10, 0.8, 3, 20, 0.1, seed=1)
+    with pytest.raises(AttributeError, match="sim.population.virulence"):
+        sim.population[0].virulence = 0.5
+    sim.population.virulence = 0.5
+    assert sim.population[0].virulence == 0.5
+
+def test_person_is_a_view_of_the_store():
+    sim = Simulation(100, 0.8, 3, 20, 0.1, seed=1)
+    person = sim.population[7]
+    person.hygiene = 0.25
+    assert sim.population.hygiene[7] == 0.25
+    assert person == sim.population[7] and person != sim.population[8]
+    assert len({sim.population[7], sim.population[7]}) == 1
+    with pytest.raises(IndexError): sim.population[100]
+
+def test_standalone_person_keeps_its_arguments():
+    person = Person(0.8, 3, 20, 0.1, natural_immunity=0.5, hygiene=0.25, sociability=0.75, infected=True)
+    assert (person.natural_immunity, person.hygiene, person.sociability, person.infected, person.dead) == (0.5, 0.25, 0.75, True, False)
@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+import numpy as np
+from engines import runSimulation
+from result_cache import ResultCache
+from simulation_data import data
+
+def sameData(a, b):
+    return a.totalDays == b.totalDays and all(list(a.getColumn(name)) == list(b.getColumn(name)) for name in data)
+
+def cachedFiles(directory):
+    return sorted(name for folder, _, names in os.walk(directory) for name in names if name.endswith(".dsim"))
+
+def test_hit_returns_the_same_run(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    first = cache.run("agent", 500, 0.8, 3, 20, 0.1, seed=2)
+    second = cache.run("agent", 500, 0.8, 3, 20, 0.1, seed=2)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert sameData(first, second)
+    assert sameData(second, runSimulation("agent", 500, 0.8, 3, 20, 0.1, seed=2))
+
+def test_key_normalises_numbers(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    plain = cache.key("vector", 1000, 0.8, 3, 20, 0, 5)
+    assert cache.key("vector", np.int64(1000), np.float64(0.8), np.int32(3), np.int64(20), 0.0, np.int64(5)) == plain
+    assert cache.key("vector", 1000, 0.8, 3, 20, 0, 6) != plain
+
+def test_concurrent_requests_are_coalesced(tmp_path, monkeypatch):
+    import result_cache
+    calls = []
+    def slowRun(*args, **kwargs):
+        calls.append(args)
+        time.sleep(0.2)
+        return runSimulation(*args, **kwargs)
+    monkeypatch.setattr(result_cache, "runSimulation", slowRun)
+
+    cache = ResultCache(str(tmp_path))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.run("agent", 500, 0.8, 3, 20, 0.1, seed=4))) for i in range(6)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (5, 1)
+    assert all(sameData(result, results[0]) for result in results)
+
+def test_eviction_drops_the_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path))   # five days each, so every file is the same size
+    for seed in range(3):
+        cache.run("agent", 200, 0.8, 3, 20, 0.1, seed=seed, maxLength=5)
+    keys = [os.path.basename(cache.path(cache.key("agent", 200, 0.8, 3, 20, 0.1, seed, 5))) for seed in range(3)]
+    for age, seed in enumerate((1, 0, 2)):   # seed 1 used longest ago, then 0, then 2
+        os.utime(cache.path(cache.key("agent", 200, 0.8, 3, 20, 0.1, seed, 5)), (1000 + age, 1000 + age))
+    cache.get(cache.key("agent", 200, 0.8, 3, 20, 0.1, 1, 5))   # using seed 1 makes it the most recent
+
+    cache.maxBytes = cache.totalBytes   # room for three, so a fourth run pushes out the oldest
+    cache.run("agent", 200, 0.8, 3, 20, 0.1, seed=3, maxLength=5)
+    assert keys[0] not in cachedFiles(tmp_path)
+    assert keys[1] in cachedFiles(tmp_path) and keys[2] in cachedFiles(tmp_path)
+    assert cache.totalBytes <= cache.maxBytes
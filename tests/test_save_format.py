@@ -0,0 +1,33 @@
+import struct
+import pytest
+from simulation_data import SimulationData, data, fileMagic, fileVersion
+from simulator import Simulation
+
+def makeData(days=30, seed=3):
+    return Simulation(1000, 0.8, 3, 20, 0.1, seed=seed).run(days)
+
+@pytest.mark.parametrize("mmap", [False, True])
+@pytest.mark.parametrize("forget", [False, True])
+def test_dsim_round_trip(tmp_path, mmap, forget):
+    simData = makeData()
+    if(forget): simData.forget(keep=5)
+    simData.save(tmp_path / "run.dsim")
+    loaded = SimulationData.load(tmp_path / "run.dsim", mmap=mmap)
+
+    assert (loaded.totalDays, loaded.firstDay, loaded.popSize, loaded.randSeed) == (simData.totalDays, simData.firstDay, simData.popSize, simData.randSeed)
+    for name in data:
+        assert list(loaded.getColumn(name)) == list(simData.getColumn(name))
+    assert loaded.getDayData(-1) == simData.getDayData(-1)
+    if(forget):
+        with pytest.raises(IndexError): loaded.getDayData(0)
+
+def test_dsim_rejects_other_files(tmp_path):
+    (tmp_path / "other.dsim").write_bytes(b"not a simulation")
+    with pytest.raises(ValueError): SimulationData.load(tmp_path / "other.dsim")
+
+def test_dsim_from_a_newer_version_is_refused(tmp_path):
+    makeData().save(tmp_path / "run.dsim")
+    raw = bytearray((tmp_path / "run.dsim").read_bytes())
+    raw[len(fileMagic):len(fileMagic) + 4] = struct.pack("<I", fileVersion + 1)
+    (tmp_path / "run.dsim").write_bytes(bytes(raw))
+    with pytest.raises(ValueError, match="newer version"): SimulationData.load(tmp_path / "run.dsim")
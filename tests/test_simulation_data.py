@@ -0,0 +1,54 @@
+import copyreg
+import pickle
+import pytest
+from simulation_data import SimulationData, data
+from simulator import Simulation
+
+def makeData(days=30, seed=3):
+    return Simulation(1000, 0.8, 3, 20, 0.1, seed=seed).run(days)
+
+def test_old_days_list_pickle_converts():
+    simData = makeData()
+    days = [simData.getDayData(day) for day in range(simData.totalDays)]
+    state = {"randSeed": simData.randSeed, "popSize": simData.popSize, "days": days, "totalDays": len(days)}
+
+    class OldSimulationData:   # pickles the way SimulationData did before it had columns, as its __dict__
+        def __reduce__(self):
+            return (copyreg._reconstructor, (SimulationData, object, None), state)
+    loaded = pickle.loads(pickle.dumps(OldSimulationData()))
+
+    assert isinstance(loaded, SimulationData)
+    assert (loaded.totalDays, loaded.firstDay, loaded.popSize, loaded.randSeed) == (simData.totalDays, 0, simData.popSize, simData.randSeed)
+    assert [loaded.getDayData(day) for day in range(loaded.totalDays)] == days
+    loaded.addDayData(0, 0, 10, 900)   # and it carries on like a new one
+    assert loaded.getDayData(-1)["day"] == len(days)
+
+def test_pickle_round_trip():
+    simData = makeData()
+    loaded = pickle.loads(pickle.dumps(simData))
+    assert [loaded.getDayData(d) for d in range(loaded.totalDays)] == [simData.getDayData(d) for d in range(simData.totalDays)]
+
+def test_columns_grow_past_their_capacity():
+    simData = SimulationData(100, 1, capacity=2)
+    for day in range(100):
+        simData.addDayData(day % 7, day % 3, day, 100 - day % 5)
+    assert simData.totalDays == 100
+    assert list(simData.getColumn("number_immune")) == list(range(100))
+    assert simData.getDayData(50) == {"number_infected": 1, "number_infectious": 2, "number_immune": 50, "number_alive": 100, "number_dead": 0, "number_susceptible": 48, "day": 50}
+
+def test_forget_keeps_the_last_days():
+    simData = makeData()
+    last = [simData.getDayData(day) for day in range(simData.totalDays - 3, simData.totalDays)]
+    simData.forget(keep=3)
+    assert (simData.firstDay, simData.numKept) == (simData.totalDays - 3, 3)
+    assert [simData.getDayData(day) for day in range(simData.firstDay, simData.totalDays)] == last
+    with pytest.raises(IndexError): simData.getDayData(0)
+    simData.addDayData(1, 1, 1, 1000)
+    assert simData.getDayData(-1)["day"] == simData.totalDays - 1
+
+def test_copy_carries_on_separately():
+    simData = makeData()
+    copied = simData.copy()
+    copied.addDayData(0, 0, 0, 0)
+    assert copied.totalDays == simData.totalDays + 1
+    assert all(list(copied.getColumn(name))[:-1] == list(simData.getColumn(name)) for name in data)
@@ -0,0 +1,31 @@
+import pytest
+from engines import engines, makeSimulation
+from simulation_data import data
+from sinks import CallbackSink, ColumnarSink, CSVSink, stream
+from simulator import Simulation
+
+def makeData(days=30, seed=3):
+    return Simulation(1000, 0.8, 3, 20, 0.1, seed=seed).run(days)
+
+def writeCSV(path, simData, append=False):
+    with CSVSink(str(path), append=append) as sink:
+        sink.start(simData)
+        for day in range(simData.totalDays): sink.write(simData.getDayData(day))
+
+def test_csv_sink_replaces_unless_appending(tmp_path):
+    simData = makeData(days=10)
+    writeCSV(tmp_path / "run.csv", simData)
+    writeCSV(tmp_path / "run.csv", simData)
+    assert len((tmp_path / "run.csv").read_text().splitlines()) == 11
+    writeCSV(tmp_path / "run.csv", simData, append=True)
+    assert len((tmp_path / "run.csv").read_text().splitlines()) == 21
+
+@pytest.mark.parametrize("engine", engines)
+def test_streamed_days_match_a_full_run(tmp_path, engine):
+    reference = makeSimulation(engine, 2000, 0.8, 3, 20, 0.1, seed=6).run(200)
+    days = []
+    simData = stream(makeSimulation(engine, 2000, 0.8, 3, 20, 0.1, seed=6), [CallbackSink(days.append), ColumnarSink(str(tmp_path / "columns"), chunkSize=7)], 200)
+    assert simData.numKept == 1   # keepData=False forgets each day once the sinks have it
+    assert days == [reference.getDayData(day) for day in range(reference.totalDays)]
+    loaded = ColumnarSink.load(str(tmp_path / "columns"))
+    assert all(list(loaded.getColumn(name)) == list(reference.getColumn(name)) for name in data)
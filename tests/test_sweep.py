@@ -0,0 +1,36 @@
+import json
+import pytest
+from sweep import Sweep
+
+values = {"population_size": [300], "virulence": [0.5, 0.9], "avgDTI": [3], "avgIL": [10, 20], "DC": [0.1]}
+
+def test_resumes_from_a_cut_off_checkpoint(tmp_path):
+    checkpoint = tmp_path / "sweep.jsonl"
+    full = Sweep(values, replicates=2, seed=5, workers=1).run(str(checkpoint))
+    lines = checkpoint.read_text().splitlines()
+    assert len(lines) == 1 + 8
+
+    checkpoint.write_text("\n".join(lines[:4]) + "\n" + lines[4][:10])   # three finished rows and one cut off mid-write
+    resumed = Sweep(values, replicates=2, seed=5, workers=1).run(str(checkpoint))
+    assert resumed.equals(full)
+    written = checkpoint.read_text().splitlines()
+    assert written[4] == lines[4][:10]   # the cut off row is ended and skipped
+    assert len(written) == 1 + 3 + 1 + 5   # and only the five missing runs were added
+    assert all(json.loads(line)["cell"] >= 0 for line in written[5:])
+
+def test_seedless_sweep_resumes_with_the_checkpoints_seed(tmp_path):
+    checkpoint = tmp_path / "sweep.jsonl"
+    first = Sweep(values, samples=3, workers=1)
+    full = first.run(str(checkpoint))
+    lines = checkpoint.read_text().splitlines()
+    checkpoint.write_text("\n".join(lines[:2]) + "\n")
+
+    again = Sweep(values, samples=3, workers=1)
+    assert again.run(str(checkpoint)).equals(full)
+    assert again.seed == first.seed
+
+def test_a_different_sweep_is_refused(tmp_path):
+    checkpoint = tmp_path / "sweep.jsonl"
+    Sweep(values, seed=5, workers=1).run(str(checkpoint))
+    with pytest.raises(ValueError, match="different sweep"):
+        Sweep(values, seed=6, workers=1).run(str(checkpoint))
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from simulator import Simulation
+from transmission_log import DEATH, RECOVERY, TransmissionLog, generationIntervals, infections, offspring
+
+def test_file_log_is_written_when_a_run_stops_early(tmp_path):
+    sim = Simulation(5000, 0.8, 3, 20, 0.1, seed=1, transmissionLog=str(tmp_path / "sim.log"))
+    sim.run(30)
+    assert len(TransmissionLog.load(str(tmp_path / "sim.log"))) == len(sim.transmissionLog)
+
+    for day in sim.iterDays(40):
+        if(day["day"] == 35): break
+    assert len(TransmissionLog.load(str(tmp_path / "sim.log"))) == len(sim.transmissionLog)
+
+@pytest.mark.parametrize("eventDriven", [False, True])
+def test_log_matches_the_counts(eventDriven):
+    sim = Simulation(2000, 0.8, 3, 20, 0.1, seed=5, eventDriven=eventDriven, transmissionLog=True)
+    last = sim.run().getDayData(-1)
+    events = sim.transmissionLog.events()
+    infected = infections(events)
+    assert len(infected) == len(np.unique(infected["person"])) == 2000 - last["number_susceptible"]
+    assert (events["kind"] == DEATH).sum() == last["number_dead"]
+    assert (events["kind"] == RECOVERY).sum() == last["number_immune"]
+    assert offspring(events, 2000).sum() == len(infected) - 1   # everyone but patient zero was infected by someone
+    assert (generationIntervals(events, 2000) >= 1).all()
+
+def test_file_and_memory_logs_agree(tmp_path):
+    inMemory = Simulation(2000, 0.8, 3, 20, 0.1, seed=5, transmissionLog=True)
+    inMemory.run()
+    onDisk = Simulation(2000, 0.8, 3, 20, 0.1, seed=5, transmissionLog=str(tmp_path / "sim.log"))
+    onDisk.transmissionLog.chunkSize = 1000   # several chunks
+    onDisk.run()
+    assert TransmissionLog.load(str(tmp_path / "sim.log"), mmap=False).tolist() == inMemory.transmissionLog.events().tolist()